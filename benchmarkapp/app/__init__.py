@@ -45,14 +45,9 @@ if not app.debug:
     app.logger.setLevel(logging.INFO)
     app.logger.info('BenchmarkApp startup')
 
-from app import routes, models, errors
+from app import routes, models, errors, jobs, commands
 
 
 @app.context_processor
 def utility_processor():
-    def format_tabs(string_tab):
-        str_data = string_tab.split(' ')
-        float_tab = [float(strdat) for strdat in str_data]
-        return float_tab
-
-    return dict(format_tabs=format_tabs, zip=zip)
+    return dict(zip=zip)
@@ -0,0 +1,291 @@
+"""
+The commands of the application that are not tied to a module of their own: the evaluation workers, the
+published references, the metric cache, the profiles, the reevaluation of the submitted files and the
+startup check of the web processes.
+Like the queue, they import the numeric modules only when they run.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from collections import deque
+from contextlib import nullcontext
+import click
+from app import app, db
+from app.models import SubmittedFile
+from app.leaderboard import leaderboard
+from app.monitoring import record_timings
+from app.jobs import enqueue_profile, supervise
+from app.scores import update_scores, rescore
+
+
+@app.cli.command('worker')
+@click.option('--processes', '-p', type=int, default=None, help='Number of worker processes.')
+@click.option('--once', is_flag=True, help='Stop when the queue is empty.')
+def worker_command(processes, once):
+    """Run the evaluation workers."""
+    # Imported before forking, so that the workers inherit the numeric modules and the references
+    from app.benchmarklib import reference_cache
+    processes = processes or app.config['EVALUATION_WORKERS']
+    # The workers attach to the reference arrays published here instead of each loading its own copy
+    reference_cache.publish()
+    supervise(processes, once)
+
+
+@app.cli.group('references')
+def references_group():
+    """Manage the published reference arrays."""
+
+
+@references_group.command('publish')
+def references_publish():
+    """Publish the arrays of the reference models and remove the outdated ones."""
+    from app.benchmarklib import reference_cache
+    reference_cache.publish()
+    for name, reference in sorted(reference_cache.references.items()):
+        click.echo('{} -> {}'.format(name, reference.directory))
+
+
+@references_group.command('unlink')
+@click.option('--stale', is_flag=True, help='Only remove the arrays of outdated reference models.')
+def references_unlink(stale):
+    """Remove the published arrays of the reference models."""
+    from app.benchmarklib import reference_cache
+    for entry in reference_cache.unlink(stale_only=stale):
+        click.echo('Removed {}'.format(entry))
+
+
+@app.cli.group('metric-cache')
+def metric_cache_group():
+    """Manage the cache of the metric results of the snapshots."""
+
+
+@metric_cache_group.command('stats')
+def metric_cache_stats():
+    """Show the entries of the cache and the hits they got."""
+    from app.benchmarklib import metric_cache
+    stats = metric_cache.stats()
+    click.echo('{} entries (max {}), {} bytes, {} hits'.format(stats['entries'], stats['max_entries'], stats['size'],
+                                                               stats['stored_hits']))
+
+
+@metric_cache_group.command('clear')
+def metric_cache_clear():
+    """Remove every entry of the cache."""
+    from app.benchmarklib import metric_cache
+    metric_cache.clear()
+    click.echo('Cleared {}'.format(metric_cache.path))
+
+
+@app.cli.command('profile')
+@click.argument('filename')
+def profile_command(filename):
+    """Profile the next evaluation of a submitted file."""
+    submitted_file = SubmittedFile.query.filter_by(filename=filename).first()
+    if submitted_file is None:
+        raise click.BadParameter('No submitted file {}'.format(filename), param_hint='FILENAME')
+    job = enqueue_profile(submitted_file)
+    db.session.commit()
+    click.echo('Job {} will profile {}, see {}'.format(job.id, filename, app.config['PROFILE_FOLDER']))
+
+
+def reevaluate_file(file_id, path, reference_file):
+    """
+    Evaluates a file in a process of the pool of `flask reevaluate` and returns its id with its results.
+    """
+    from app.benchmarklib import Evaluation
+    from csi_eval import timing
+    # The steps of a file are evaluated serially: the files already are in parallel
+    evaluation = Evaluation(path, reference_file, max_workers=1)
+    steps, haus, middle_acc, middle_comp = [], [], [], []
+    with timing.record() if app.config['STAGE_TIMINGS'] else nullcontext() as recorder:
+        for step, step_haus, step_acc, step_comp in evaluation:
+            steps.append(step)
+            haus.append(step_haus)
+            middle_acc.append(step_acc)
+            middle_comp.append(step_comp)
+    return (file_id, (steps, haus, middle_acc, middle_comp), evaluation.size, evaluation.declared_size,
+            evaluation.params_version, evaluation.surface_metrics, recorder.summary() if recorder is not None else None)
+
+
+def store_reevaluations(results):
+    """
+    Stores the results of a batch of `reevaluate_file` in a single transaction, skipping the files deleted
+    or submitted again meanwhile. Returns the stored files.
+    """
+    sub_files = SubmittedFile.query.filter(SubmittedFile.id.in_([result[0] for result in results]),
+                                           SubmittedFile.status == 'done').all()
+    by_id = {sub_file.id: sub_file for sub_file in sub_files}
+    for file_id, curves, size, declared_size, version, surface_metrics, timings in results:
+        sub_file = by_id.get(file_id)
+        if sub_file is None:
+            continue
+        sub_file.set_curves(*curves)
+        sub_file.real_size = size
+        sub_file.estimated_size = declared_size
+        sub_file.params_version = version
+        sub_file.surface_metrics = json.dumps(surface_metrics) if surface_metrics is not None else None
+        sub_file.timings = json.dumps(timings) if timings is not None else None
+        if timings is not None:
+            record_timings(sub_file.reference_file, timings)
+        update_scores(sub_file)
+    db.session.commit()
+    leaderboard.invalidate()
+    return sub_files
+
+
+def read_checkpoint(path, run):
+    """
+    Returns the id of the last file handled by an interrupted `flask reevaluate` with the same `run`
+    (filters and parameters), or None.
+    """
+    try:
+        with open(path) as file:
+            checkpoint = json.load(file)
+    except (OSError, ValueError):
+        return None
+    return checkpoint['last_id'] if checkpoint.get('run') == run else None
+
+
+def write_checkpoint(path, run, last_id):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'w') as file:
+        json.dump({'run': run, 'last_id': last_id}, file)
+    os.replace(path + '.tmp', path)
+
+
+@app.cli.command('reevaluate')
+@click.option('--reference', default=None, help='Only the files evaluated against this reference model.')
+@click.option('--user', default=None, help='Only the files of this user.')
+@click.option('--since', type=click.DateTime(), default=None, help='Only the files submitted from this date.')
+@click.option('--until', type=click.DateTime(), default=None, help='Only the files submitted before this date.')
+@click.option('--all', 'all_files', is_flag=True,
+              help='Also the files already evaluated with the current metrics and parameters.')
+@click.option('--processes', '-p', type=int, default=None, help='Number of processes evaluating the files.')
+@click.option('--batch', type=int, default=20, help='Number of files stored per transaction.')
+@click.option('--restart', is_flag=True, help='Ignore the checkpoint of an interrupted run.')
+def reevaluate_command(reference, user, since, until, all_files, processes, batch, restart):
+    """Evaluate again the submitted files, e.g. after the metrics or their parameters changed."""
+    from concurrent.futures import ProcessPoolExecutor
+    # Imported before the pool forks, so that its processes inherit the numeric modules and the references
+    from app.benchmarklib import PARAMS_VERSION
+    from app.models import User
+    processes = processes or app.config['EVALUATION_WORKERS']
+    query = SubmittedFile.query.filter_by(status='done')
+    if reference is not None:
+        query = query.filter_by(reference_file=reference)
+    if user is not None:
+        owner = User.query.filter_by(username=user).first()
+        if owner is None:
+            raise click.BadParameter('No user {}'.format(user), param_hint='--user')
+        query = query.filter_by(user_id=owner.id)
+    if since is not None:
+        query = query.filter(SubmittedFile.timestamp >= since)
+    if until is not None:
+        query = query.filter(SubmittedFile.timestamp < until)
+    if not all_files:
+        query = query.filter(db.or_(SubmittedFile.params_version.is_(None),
+                                    SubmittedFile.params_version != PARAMS_VERSION))
+    run = {'reference': reference, 'user': user, 'since': since and since.isoformat(),
+           'until': until and until.isoformat(), 'all': all_files, 'params_version': PARAMS_VERSION}
+    checkpoint_path = app.config['REEVALUATE_CHECKPOINT']
+    last_id = None if restart else read_checkpoint(checkpoint_path, run)
+    if last_id is not None:
+        click.echo('Resuming after file {}'.format(last_id))
+        query = query.filter(SubmittedFile.id > last_id)
+    files = query.with_entities(SubmittedFile.id, SubmittedFile.filename, SubmittedFile.reference_file).order_by(
+        SubmittedFile.id).all()
+    click.echo('Evaluating {} files with {} processes'.format(len(files), processes))
+
+    stored = failed = 0
+    baselines = set(app.config['SCORE_BASELINES'].values())
+    rescored_references = set()
+    results = []
+
+    def flush():
+        # The checkpoint only moves past the files whose results are committed
+        nonlocal stored
+        sub_files = store_reevaluations(results) if results else []
+        stored += len(sub_files)
+        rescored_references.update(sub_file.reference_file for sub_file in sub_files
+                                   if sub_file.filename in baselines)
+        write_checkpoint(checkpoint_path, run, last_id)
+        results.clear()
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        pending = deque()
+        remaining = iter(files)
+        while True:
+            # A few files per process are in flight, and their results are handled in id order
+            for file_id, filename, reference_file in remaining:
+                pending.append((file_id, filename, executor.submit(
+                    reevaluate_file, file_id, os.path.join(app.config['UPLOAD_FOLDER'], filename), reference_file)))
+                if len(pending) >= 2 * processes:
+                    break
+            if not pending:
+                break
+            file_id, filename, future = pending.popleft()
+            try:
+                results.append(future.result())
+            except Exception:
+                app.logger.exception('The reevaluation of {} failed'.format(filename))
+                failed += 1
+            last_id = file_id
+            if len(results) >= batch or not pending:
+                flush()
+    # The scores against a baseline evaluated again are stale
+    for reference_file in sorted(rescored_references):
+        rescore(reference_file)
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    click.echo('Stored the results of {} files, {} failed'.format(stored, failed))
+
+
+# Modules the web processes must not import at startup
+HEAVY_MODULES = ('numpy', 'scipy', 'csi_eval.evaluation', 'app.benchmarklib')
+
+# Run in a fresh interpreter by `startup_check`: imports the application and reports what it cost
+STARTUP_PROBE = """
+import json, resource, sys, time
+sys.path.insert(0, %r)
+start = time.perf_counter()
+import app
+seconds = time.perf_counter() - start
+print(json.dumps({'seconds': seconds, 'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                  'heavy': [name for name in %r if name in sys.modules]}))
+"""
+
+
+def measure_startup(runs=3, cwd=None):
+    """
+    Imports the application in `runs` fresh interpreters, started in `cwd`, and returns the report of the
+    median one: its import time in seconds, its maximum RSS in KB and the `HEAVY_MODULES` it imported.
+    """
+    root = os.path.dirname(app.root_path)
+    reports = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', STARTUP_PROBE % (root, HEAVY_MODULES)], cwd=cwd or root,
+                                check=True, capture_output=True, text=True).stdout
+        reports.append(json.loads(output.splitlines()[-1]))
+    reports.sort(key=lambda report: report['seconds'])
+    return reports[len(reports) // 2]
+
+
+@app.cli.command('startup-check')
+@click.option('--budget', type=float, default=None, help='Maximum import time in seconds.')
+@click.option('--runs', type=int, default=3, help='Number of imports measured, the median is checked.')
+def startup_check(budget, runs):
+    """Measure the import of the application by a web process and fail above the budget."""
+    budget = budget or app.config['STARTUP_BUDGET']
+    median = measure_startup(runs)
+    click.echo('import app: {:.3f}s (median of {}), max RSS {} MB'.format(median['seconds'], runs,
+                                                                         median['max_rss_kb'] // 1024))
+    failures = []
+    if median['seconds'] > budget:
+        failures.append('over the budget of {}s'.format(budget))
+    if median['heavy']:
+        failures.append('imports {}'.format(', '.join(median['heavy'])))
+    if failures:
+        click.echo('Startup check failed: {}'.format('; '.join(failures)), err=True)
+        sys.exit(1)
@@ -46,4 +46,5 @@ class EditProfileForm(FlaskForm):
 class UploadFileForm(FlaskForm):
     file = FileField()
     reference_file = SelectField('Reference File', choices=app.config['AVAILABLE_MODELS'].keys())
+    preview = SelectField('Quick preview', choices=[('auto', 'Default of the reference'), ('yes', 'Yes'), ('no', 'No')])
     submit = SubmitField('Upload')
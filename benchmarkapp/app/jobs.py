@@ -0,0 +1,374 @@
+"""
+Evaluation of the submitted files by a pool of worker processes, outside of the web requests.
+The jobs are rows of the `evaluation_job` table: the upload inserts a pending job, a worker claims it,
+evaluates the file while reporting its progress, then stores the results.
+A file can also get a `preview` job, claimed before the exact ones, which quickly stores approximate
+results flagged as provisional until the exact job replaces them.
+The numeric modules (`benchmarklib`, `csi_eval`) are imported by the functions that evaluate, so that
+the web processes, which import this module for the queue, start without them.
+"""
+
+import json
+import multiprocessing
+import os
+import random
+import socket
+import threading
+import time
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from app import app, db
+from app.models import SubmittedFile, EvaluationJob, encode_curves
+from app.leaderboard import leaderboard
+from app.monitoring import record_timings
+from app.scores import update_scores
+
+# Minimum delay between two progress updates of a running job, in seconds
+PROGRESS_INTERVAL = 1.0
+
+
+def enqueue(submitted_file, preview=False):
+    """
+    Creates the pending job evaluating a submitted file, preceded by a preview job if `preview` is set.
+    The caller commits the session.
+    """
+    submitted_file.status = 'pending'
+    submitted_file.progress = 0.0
+    if preview:
+        db.session.add(EvaluationJob(submitted_file_id=submitted_file.id, status='pending', kind='preview'))
+    job = EvaluationJob(submitted_file_id=submitted_file.id, status='pending', kind='exact')
+    db.session.add(job)
+    return job
+
+
+def enqueue_profile(submitted_file):
+    """
+    Makes the next exact evaluation of a submitted file run under the profilers: its pending job if there
+    is one, else a new job. The results of an evaluated file stay visible meanwhile. The caller commits the
+    session.
+    """
+    job = EvaluationJob.query.filter_by(submitted_file_id=submitted_file.id, kind='exact', status='pending').first()
+    if job is None:
+        job = EvaluationJob(submitted_file_id=submitted_file.id, status='pending', kind='exact')
+        db.session.add(job)
+        if submitted_file.status != 'done':
+            submitted_file.status = 'pending'
+            submitted_file.progress = 0.0
+    job.profile = True
+    return job
+
+
+def reuse_results(submitted_file):
+    """
+    Copies the results of an evaluated file with the same content and reference into `submitted_file`,
+    which then needs no job. Returns whether there was one. The caller commits the session.
+    """
+    if submitted_file.content_hash is None:
+        return False
+    source = SubmittedFile.query.filter(SubmittedFile.content_hash == submitted_file.content_hash,
+                                        SubmittedFile.reference_file == submitted_file.reference_file,
+                                        SubmittedFile.status == 'done', SubmittedFile.id != submitted_file.id).first()
+    if source is None:
+        return False
+    for column in ('curve_data', 'tab_absc', 'tab_hausdorff', 'tab_middle_accurracy', 'tab_middle_completeness',
+                   'real_size', 'estimated_size', 'params_version', 'surface_metrics'):
+        setattr(submitted_file, column, getattr(source, column))
+    submitted_file.provisional = False
+    submitted_file.tab_bounds = None
+    submitted_file.progress = 1.0
+    submitted_file.status = 'done'
+    update_scores(submitted_file)
+    return True
+
+
+def wants_preview(reference_file, choice='auto'):
+    """
+    Whether a submission gets a preview: `choice` is 'yes', 'no', or 'auto' to follow the `preview` key of
+    the reference model in `Config.AVAILABLE_MODELS`.
+    """
+    if choice == 'auto':
+        return app.config['AVAILABLE_MODELS'].get(reference_file, {}).get('preview', False)
+    return choice == 'yes'
+
+
+def claim_job(worker):
+    """
+    Claims the oldest pending job for `worker`, previews first, or returns None if there is none.
+    The claim is a conditional update, so that two workers can never run the same job.
+    """
+    while True:
+        job = EvaluationJob.query.filter_by(status='pending').order_by(
+            db.case((EvaluationJob.kind == 'preview', 0), else_=1), EvaluationJob.id).first()
+        if job is None:
+            return None
+        claimed = EvaluationJob.query.filter_by(id=job.id, status='pending').update(
+            {'status': 'running', 'worker': worker, 'heartbeat': datetime.utcnow(),
+             'attempts': EvaluationJob.attempts + 1}, synchronize_session=False)
+        db.session.commit()
+        if claimed:
+            db.session.refresh(job)
+            return job
+
+
+def requeue_stale_jobs(worker=None):
+    """
+    Puts back in the queue the running jobs whose worker stopped reporting for more than `JOB_TIMEOUT`
+    seconds (the worker crashed or was killed), or all the running jobs of `worker` if it is given (its
+    process is known to be dead), or fails them once they reached `JOB_MAX_ATTEMPTS`.
+    """
+    if worker is None:
+        limit = datetime.utcnow() - timedelta(seconds=app.config['JOB_TIMEOUT'])
+        stale_jobs = EvaluationJob.query.filter(EvaluationJob.status == 'running',
+                                                EvaluationJob.heartbeat < limit).all()
+    else:
+        stale_jobs = EvaluationJob.query.filter_by(status='running', worker=worker).all()
+    for job in stale_jobs:
+        submitted_file = SubmittedFile.query.get(job.submitted_file_id)
+        # A preview, or the profiling of an evaluated file, does not change the status of the file
+        if job.kind == 'preview' or (job.profile and submitted_file is not None and submitted_file.status == 'done'):
+            submitted_file = None
+        if job.attempts >= app.config['JOB_MAX_ATTEMPTS']:
+            job.status = 'failed'
+            job.error = 'The worker {} stopped responding'.format(job.worker)
+            if submitted_file is not None:
+                submitted_file.status = 'failed'
+        else:
+            job.status = 'pending'
+            if submitted_file is not None:
+                submitted_file.status = 'pending'
+        app.logger.warning('Job {} of worker {} is stale, now {}'.format(job.id, job.worker, job.status))
+    db.session.commit()
+    return len(stale_jobs)
+
+
+class Heartbeat(threading.Thread):
+    """
+    The thread updating the heartbeat of a running job every `JOB_HEARTBEAT_INTERVAL` seconds, from its
+    own connection, so that a job busy in a step longer than `JOB_TIMEOUT` is not taken for a stale one.
+    It stops with its worker process, after which the job is requeued.
+    """
+
+    def __init__(self, job_id):
+        super().__init__(name='heartbeat-{}'.format(job_id), daemon=True)
+        self.job_id = job_id
+        self.stopped = threading.Event()
+
+    def run(self):
+        with app.app_context():
+            while not self.stopped.wait(app.config['JOB_HEARTBEAT_INTERVAL']):
+                try:
+                    with db.engine.begin() as connection:
+                        connection.execute(db.update(EvaluationJob).where(
+                            EvaluationJob.id == self.job_id, EvaluationJob.status == 'running').values(
+                            heartbeat=datetime.utcnow()))
+                except Exception:
+                    # e.g. the database is locked: the next beat is still well within the timeout
+                    app.logger.exception('Heartbeat of job {} failed'.format(self.job_id))
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stopped.set()
+        self.join()
+        return False
+
+
+def run_job(job):
+    """
+    Evaluates the submitted file of a claimed job and stores its results.
+    """
+    submitted_file = SubmittedFile.query.get(job.submitted_file_id)
+    if submitted_file is None:
+        job.status = 'failed'
+        job.error = 'The submitted file was deleted'
+        db.session.commit()
+        return
+    if job.kind == 'preview':
+        run_preview_job(job, submitted_file)
+        return
+    from app.benchmarklib import Evaluation
+    from csi_eval import profiling, timing
+    # The results of an evaluated file stay visible while it is profiled again
+    keep_status = job.profile and submitted_file.status == 'done'
+    profiled = job.profile or random.random() < app.config['PROFILE_RATE']
+    if not keep_status:
+        submitted_file.status = 'running'
+    db.session.commit()
+    profile = None
+    try:
+        path = os.path.join(app.config['UPLOAD_FOLDER'], submitted_file.filename)
+        # A profiled evaluation computes every step instead of taking them from the metric cache, and its
+        # stage timings, distorted by the profilers, are not recorded
+        evaluation = Evaluation(path, submitted_file.reference_file,
+                                use_cache=app.config['METRIC_CACHE'] and not profiled)
+        steps, haus, middle_acc, middle_comp = [], [], [], []
+        last_update = time.monotonic()
+        with timing.record() if app.config['STAGE_TIMINGS'] and not profiled else nullcontext() as recorder, \
+                profiling.profile() if profiled else nullcontext() as profile:
+            for step, step_haus, step_acc, step_comp in evaluation:
+                steps.append(step)
+                haus.append(step_haus)
+                middle_acc.append(step_acc)
+                middle_comp.append(step_comp)
+                if profile is not None:
+                    profile.checkpoint()
+                if not keep_status and time.monotonic() - last_update > PROGRESS_INTERVAL:
+                    submitted_file.progress = len(steps) / max(evaluation.step_count, 1)
+                    db.session.commit()
+                    last_update = time.monotonic()
+    except Exception as error:
+        db.session.rollback()
+        app.logger.exception('Job {} failed'.format(job.id))
+        job.status = 'failed'
+        job.error = str(error)[:512]
+        if not keep_status:
+            submitted_file.status = 'failed'
+        if profile is not None:
+            save_profile(submitted_file, job, profile)
+        db.session.commit()
+        return
+    if profile is not None:
+        save_profile(submitted_file, job, profile)
+    elif recorder is not None:
+        timings = recorder.summary()
+        submitted_file.timings = json.dumps(timings)
+        record_timings(submitted_file.reference_file, timings)
+    else:
+        submitted_file.timings = None
+    submitted_file.set_curves(steps, haus, middle_acc, middle_comp)
+    submitted_file.real_size = evaluation.size
+    submitted_file.estimated_size = evaluation.declared_size
+    submitted_file.params_version = evaluation.params_version
+    submitted_file.surface_metrics = None
+    if evaluation.surface_metrics is not None:
+        submitted_file.surface_metrics = json.dumps(evaluation.surface_metrics)
+    submitted_file.provisional = False
+    submitted_file.tab_bounds = None
+    submitted_file.progress = 1.0
+    submitted_file.status = 'done'
+    update_scores(submitted_file)
+    job.status = 'done'
+    db.session.commit()
+    # The file may be the best submission of its user
+    leaderboard.invalidate()
+    if evaluation.use_cache:
+        app.logger.info('Evaluated {}: {} of {} steps from the metric cache'.format(
+            submitted_file.filename, evaluation.cache_hits, evaluation.cache_hits + evaluation.cache_misses))
+
+
+def save_profile(submitted_file, job, profile):
+    """
+    Writes the artifacts of the profile of a job and links them to its submitted file.
+    """
+    submitted_file.profile = os.path.join(str(submitted_file.id), str(job.id))
+    profile.save(os.path.join(app.config['PROFILE_FOLDER'], submitted_file.profile))
+    app.logger.info('Profiled the evaluation of {} in {}'.format(submitted_file.filename, submitted_file.profile))
+
+
+def run_preview_job(job, submitted_file):
+    """
+    Computes the approximate results of the submitted file of a claimed preview job and stores them as
+    provisional, unless the exact results are already there.
+    """
+    from app.benchmarklib import PreviewEvaluation
+    try:
+        path = os.path.join(app.config['UPLOAD_FOLDER'], submitted_file.filename)
+        evaluation = PreviewEvaluation(path, submitted_file.reference_file)
+        results = list(evaluation)
+    except Exception as error:
+        db.session.rollback()
+        app.logger.exception('Preview job {} failed'.format(job.id))
+        job.status = 'failed'
+        job.error = str(error)[:512]
+        db.session.commit()
+        return
+    steps, haus, middle_acc, middle_comp, bounds = zip(*results) if results else ([], [], [], [], [])
+    # Conditional update: the exact job may have finished in the meantime
+    SubmittedFile.query.filter(SubmittedFile.id == submitted_file.id, SubmittedFile.status != 'done').update(
+        {'curve_data': encode_curves(steps, haus, middle_acc, middle_comp), 'tab_absc': None, 'tab_hausdorff': None,
+         'tab_middle_accurracy': None, 'tab_middle_completeness': None,
+         'tab_bounds': json.dumps([[[float(value) for value in interval] for interval in step] for step in bounds]),
+         'provisional': True}, synchronize_session=False)
+    job.status = 'done'
+    db.session.commit()
+    app.logger.info('Preview of {} stored ({} steps skipped)'.format(submitted_file.filename, evaluation.skipped))
+
+
+def abandon_job(job_id, submitted_file_id, kind, error):
+    """
+    Fails a job interrupted by an error `run_job` could not handle, e.g. its submitted file was deleted
+    during the evaluation, in which case the job is gone with it and there is nothing left to update.
+    """
+    try:
+        EvaluationJob.query.filter_by(id=job_id, status='running').update(
+            {'status': 'failed', 'error': str(error)[:512]}, synchronize_session=False)
+        if kind != 'preview':
+            SubmittedFile.query.filter_by(id=submitted_file_id, status='running').update(
+                {'status': 'failed'}, synchronize_session=False)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        app.logger.exception('Could not mark job {} as failed'.format(job_id))
+
+
+def worker_name(pid=None):
+    return '{}:{}'.format(socket.gethostname(), pid or os.getpid())
+
+
+def work(worker=None, once=False):
+    """
+    The loop of a worker process: claims and runs jobs until stopped, or until the queue is empty if
+    `once` is set. An error while running a job fails that job only.
+    """
+    worker = worker or worker_name()
+    with app.app_context():
+        # Connections inherited from the parent process must not be shared, nor closed from here
+        db.engine.dispose(close=False)
+        app.logger.info('Evaluation worker {} started'.format(worker))
+        while True:
+            job = None
+            try:
+                requeue_stale_jobs()
+                job = claim_job(worker)
+                if job is not None:
+                    job_id, submitted_file_id, kind = job.id, job.submitted_file_id, job.kind
+                    with Heartbeat(job_id):
+                        run_job(job)
+                    continue
+            except Exception as error:
+                db.session.rollback()
+                if job is None:
+                    app.logger.exception('Worker {} could not claim a job'.format(worker))
+                else:
+                    app.logger.exception('Job {} failed'.format(job_id))
+                    abandon_job(job_id, submitted_file_id, kind, error)
+                    continue
+            if once and job is None:
+                return
+            time.sleep(app.config['JOB_POLL_INTERVAL'])
+
+
+def start_worker(once):
+    process = multiprocessing.Process(target=work, kwargs={'once': once})
+    process.start()
+    return process
+
+
+def supervise(processes, once):
+    """
+    Runs `processes` workers until they stop, restarting those that die. Their job is requeued at once
+    rather than after `JOB_TIMEOUT`.
+    """
+    workers = [start_worker(once) for _ in range(processes)]
+    while workers:
+        time.sleep(app.config['JOB_POLL_INTERVAL'])
+        for process in [process for process in workers if not process.is_alive()]:
+            workers.remove(process)
+            # A worker only stops by itself with --once, once the queue is empty
+            if process.exitcode != 0:
+                app.logger.error('Worker {} died with exit code {}, restarting it'.format(
+                    worker_name(process.pid), process.exitcode))
+                requeue_stale_jobs(worker_name(process.pid))
+                workers.append(start_worker(once))
@@ -0,0 +1,90 @@
+"""
+The data of the index page (the best evaluated submission of every user) and the list of users of the
+navbar, each fetched with a single query and kept in memory until a submission or a profile changes.
+A change is signalled by touching a stamp file, so that the caches of every process of the host (web
+server and evaluation workers) are invalidated together.
+"""
+
+import os
+import threading
+from collections import namedtuple
+from app import app, db
+from app.models import User, SubmittedFile
+
+# The best submission of a user, with its curves ready for the charts
+LeaderboardEntry = namedtuple('LeaderboardEntry', ['username', 'filename', 'real_size', 'estimated_size', 'points'])
+# A user of the navbar
+LeaderboardUser = namedtuple('LeaderboardUser', ['id', 'username'])
+
+
+class Leaderboard:
+    """
+    The in-process cache of the leaderboard, valid as long as the modification time of `stamp_path` does
+    not change.
+    """
+
+    def __init__(self, stamp_path):
+        self.stamp_path = stamp_path
+        self.lock = threading.Lock()
+        self.stamp = None
+        self.entries = None
+        self.user_list = None
+
+    def current_stamp(self):
+        try:
+            return os.stat(self.stamp_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def refresh(self):
+        """
+        Drops the cached data if another process invalidated it.
+        """
+        stamp = self.current_stamp()
+        if stamp != self.stamp:
+            self.stamp = stamp
+            self.entries = None
+            self.user_list = None
+
+    def invalidate(self):
+        """
+        Drops the cached data of every process, after a submission or a profile changed.
+        """
+        os.makedirs(os.path.dirname(self.stamp_path), exist_ok=True)
+        with open(self.stamp_path, 'a'):
+            os.utime(self.stamp_path)
+        with self.lock:
+            self.entries = None
+            self.user_list = None
+
+    def best_submissions(self):
+        """
+        Returns the `LeaderboardEntry` of every user whose best submission is evaluated, by user id.
+        """
+        with self.lock:
+            self.refresh()
+            if self.entries is None:
+                rows = db.session.query(User.username, SubmittedFile).join(
+                    SubmittedFile, db.and_(SubmittedFile.id == User.best_submitted_file,
+                                           SubmittedFile.user_id == User.id)).filter(
+                    SubmittedFile.status == 'done').order_by(User.id).all()
+                self.entries = [LeaderboardEntry(username, sub_file.filename, sub_file.real_size,
+                                                 sub_file.estimated_size,
+                                                 {name: sub_file.chart_points(name)
+                                                  for name in ('hausdorff', 'accuracy', 'completeness')})
+                                for username, sub_file in rows]
+            return self.entries
+
+    def users(self):
+        """
+        Returns the `LeaderboardUser` of every user, for the navbar.
+        """
+        with self.lock:
+            self.refresh()
+            if self.user_list is None:
+                self.user_list = [LeaderboardUser(*row) for row in
+                                  db.session.query(User.id, User.username).order_by(User.id).all()]
+            return self.user_list
+
+
+leaderboard = Leaderboard(app.config['LEADERBOARD_STAMP'])
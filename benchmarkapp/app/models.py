@@ -1,4 +1,6 @@
-from app import db, login
+import os
+import shutil
+from app import app, db, login
 from datetime import datetime
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
@@ -21,6 +23,32 @@ class User(UserMixin, db.Model):
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
 
+    @property
+    def is_admin(self):
+        return self.username in app.config['ADMIN_USERNAMES']
+
+
+# The curves of an evaluation, in the order of the rows of `SubmittedFile.curves`. numpy is imported by the
+# functions handling them only, so that the web processes start without it
+CURVES = ('steps', 'hausdorff', 'accuracy', 'completeness')
+
+
+def encode_curves(steps, haus, middle_acc, middle_comp):
+    """
+    Packs the per-step curves of an evaluation into the bytes of a little-endian float64 array, one row per
+    curve of `CURVES`.
+    """
+    import numpy as np
+    return np.array([steps, haus, middle_acc, middle_comp], dtype='<f8').reshape(len(CURVES), -1).tobytes()
+
+
+def decode_curves(data):
+    """
+    Returns the (4, steps) array of curves packed by `encode_curves`.
+    """
+    import numpy as np
+    return np.frombuffer(data, dtype='<f8').reshape(len(CURVES), -1)
+
 
 class SubmittedFile(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -28,20 +56,123 @@ class SubmittedFile(db.Model):
     reference_file = db.Column(db.String(64))
     timestamp = db.Column(db.DateTime, index=True, default=datetime.utcnow)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    # Legacy text curves, limited to 4096 characters: the curves are now stored in `curve_data`
     tab_absc = db.Column(db.String(4096))
     tab_hausdorff = db.Column(db.String(4096))
     tab_middle_completeness = db.Column(db.String(4096))
     tab_middle_accurracy = db.Column(db.String(4096))
     real_size = db.Column(db.Integer)
     estimated_size = db.Column(db.Integer)
+    status = db.Column(db.String(16), index=True, default='done')
+    progress = db.Column(db.Float, default=0.0)
+    # Approximate results of a preview, replaced by the exact ones, and their bounds in JSON
+    provisional = db.Column(db.Boolean, default=False)
+    tab_bounds = db.Column(db.Text)
+    # sha1 of the uploaded file, to reuse the results of identical files
+    content_hash = db.Column(db.String(40), index=True)
+    # The curves packed by `encode_curves`
+    curve_data = db.Column(db.LargeBinary)
+    # The version of the metrics and of their parameters the curves were computed with
+    # (`metric_cache.params_version`), to find the stale ones (see `flask reevaluate`)
+    params_version = db.Column(db.String(64), index=True)
+    # Time and memory spent in each stage of the evaluation, in JSON (`timing.Recorder.summary`)
+    timings = db.Column(db.Text)
+    # Metrics of the last snapshot against the surface of the reference, in JSON (`evaluation.surface_metrics`)
+    surface_metrics = db.Column(db.Text)
+    # The folder of the last profile of the evaluation, relative to `Config.PROFILE_FOLDER`
+    profile = db.Column(db.String(64))
+    # Rate-distortion scores computed from the curves (`scores.compute_scores`), to rank the submissions
+    auc_hausdorff = db.Column(db.Float, index=True)
+    auc_accuracy = db.Column(db.Float, index=True)
+    auc_completeness = db.Column(db.Float, index=True)
+    hausdorff_low_rate = db.Column(db.Float, index=True)
+    hausdorff_high_rate = db.Column(db.Float, index=True)
+    accuracy_low_rate = db.Column(db.Float, index=True)
+    accuracy_high_rate = db.Column(db.Float, index=True)
+    bd_rate_hausdorff = db.Column(db.Float, index=True)
+    bd_rate_accuracy = db.Column(db.Float, index=True)
 
     def __repr__(self):
         return '<SubmittedFile {} {}>'.format(self.id, self.filename)
 
+    def set_curves(self, steps, haus, middle_acc, middle_comp):
+        """
+        Stores the curves of an evaluation, replacing the legacy text ones.
+        """
+        self.tab_absc = self.tab_hausdorff = self.tab_middle_accurracy = self.tab_middle_completeness = None
+        self.curve_data = encode_curves(steps, haus, middle_acc, middle_comp)
+
+    @property
+    def curves(self):
+        """
+        The (4, steps) array of the curves of `CURVES`, read from the legacy text columns for the files
+        evaluated before `curve_data` and not converted by its migration. Empty if the file is not evaluated.
+        """
+        import numpy as np
+        if self.curve_data is not None:
+            return decode_curves(self.curve_data)
+        if not self.tab_absc:
+            return np.zeros((len(CURVES), 0))
+        return np.array([text.split(' ') for text in (self.tab_absc, self.tab_hausdorff, self.tab_middle_accurracy,
+                                                       self.tab_middle_completeness)], dtype=np.float64)
+
+    def curve(self, name):
+        """
+        Returns one curve of `CURVES` as an array.
+        """
+        return self.curves[CURVES.index(name)]
+
+    def chart_points(self, name):
+        """
+        Returns the points {x: step, y: value} of a curve, for the charts.
+        """
+        curves = self.curves
+        return [{'x': x, 'y': y} for x, y in zip(curves[0].tolist(), curves[CURVES.index(name)].tolist())]
+
+
+class EvaluationJob(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    submitted_file_id = db.Column(db.Integer, db.ForeignKey('submitted_file.id'), index=True)
+    status = db.Column(db.String(16), index=True, default='pending')
+    kind = db.Column(db.String(16), default='exact')
+    # Run the evaluation under the profilers (`csi_eval.profiling`)
+    profile = db.Column(db.Boolean, default=False)
+    attempts = db.Column(db.Integer, default=0)
+    worker = db.Column(db.String(64))
+    created = db.Column(db.DateTime, default=datetime.utcnow)
+    heartbeat = db.Column(db.DateTime)
+    error = db.Column(db.String(512))
+
+    def __repr__(self):
+        return '<EvaluationJob {} {} {}>'.format(self.id, self.submitted_file_id, self.status)
+
+
+class TimingAggregate(db.Model):
+    """
+    The observations of the evaluations (`metric` 'evaluation', by reference) or of their stages (`metric`
+    'stage', by stage name) falling in one bucket of the histograms of `/metrics` (`monitoring`).
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    metric = db.Column(db.String(16))
+    label = db.Column(db.String(64))
+    # Upper bound of the bucket, as in the `le` label of the histograms
+    le = db.Column(db.String(32))
+    count = db.Column(db.Integer, default=0)
+    # Sums of the wall and CPU seconds of the observations, and highest peak memory of the evaluations
+    seconds = db.Column(db.Float, default=0.0)
+    cpu_seconds = db.Column(db.Float, default=0.0)
+    peak_rss_kb = db.Column(db.Integer)
+    __table_args__ = (db.UniqueConstraint('metric', 'label', 'le'),)
+
+    def __repr__(self):
+        return '<TimingAggregate {} {} {}>'.format(self.metric, self.label, self.le)
+
 
 def del_sub_file(sub_file):
+    EvaluationJob.query.filter_by(submitted_file_id=sub_file.id).delete()
     db.session.delete(sub_file)
     db.session.commit()
+    shutil.rmtree(os.path.join(app.config['PROFILE_FOLDER'], str(sub_file.id)), ignore_errors=True)
     user = User.query.filter_by(id=sub_file.user_id).first()
     if user.best_submitted_file == sub_file.id:
         user.best_submitted_file = None
@@ -0,0 +1,168 @@
+"""
+The metrics of the evaluations in the Prometheus text format, for `/metrics`: latency histograms of
+the evaluations and of each of their stages, their CPU time and peak memory (`csi_eval.timing`), and the
+number of jobs of the queue by kind and status.
+The histograms are aggregated in the `timing_aggregate` table when the results of an evaluation are stored
+(`record_timings`), so that a scrape reads a few rows whatever the number of submitted files, and every web
+process serves the same values whichever process evaluated the files. Like Prometheus counters, they count
+every evaluation, including those of the files evaluated again or deleted since.
+"""
+
+import bisect
+import json
+import click
+from sqlalchemy.exc import IntegrityError
+from app import app, db
+from app.models import SubmittedFile, EvaluationJob, TimingAggregate
+
+
+class Histogram:
+    """
+    The cumulative buckets, sum and count of the observations of a labelled metric.
+    """
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def add(self, le, count, total):
+        """
+        Adds `count` observations of the bucket `le`, summing to `total`. A bucket aggregated with other
+        `METRICS_BUCKETS` is counted in the smallest current bucket holding it.
+        """
+        self.counts[len(self.bounds) if le == '+Inf' else bisect.bisect_left(self.bounds, float(le))] += count
+        self.sum += total
+
+    def lines(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(list(self.bounds) + ['+Inf'], self.counts):
+            cumulative += count
+            lines.append('{}_bucket{} {}'.format(name, format_labels(dict(labels, le=str(bound))), cumulative))
+        lines.append('{}_sum{} {!r}'.format(name, format_labels(labels), self.sum))
+        lines.append('{}_count{} {}'.format(name, format_labels(labels), cumulative))
+        return lines
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join('{}="{}"'.format(key, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+                          for key, value in sorted(labels.items())) + '}'
+
+
+def bucket(seconds):
+    """
+    Returns the `le` label of the bucket of the histograms holding `seconds`.
+    """
+    bounds = app.config['METRICS_BUCKETS']
+    index = bisect.bisect_left(bounds, seconds)
+    return str(bounds[index]) if index < len(bounds) else '+Inf'
+
+
+def observe(metric, label, seconds, cpu_seconds, peak_rss_kb=None):
+    """
+    Adds an observation to its bucket of `timing_aggregate`. The counters are incremented by the database,
+    so that the workers storing their results at the same time do not lose any. The caller commits the
+    session.
+    """
+    key = {'metric': metric, 'label': label, 'le': bucket(seconds)}
+    values = {'count': TimingAggregate.count + 1, 'seconds': TimingAggregate.seconds + seconds,
+              'cpu_seconds': TimingAggregate.cpu_seconds + cpu_seconds}
+    if peak_rss_kb is not None:
+        values['peak_rss_kb'] = db.case((db.or_(TimingAggregate.peak_rss_kb.is_(None),
+                                                TimingAggregate.peak_rss_kb < peak_rss_kb), peak_rss_kb),
+                                        else_=TimingAggregate.peak_rss_kb)
+    update = db.update(TimingAggregate).filter_by(**key).values(values).execution_options(
+        synchronize_session=False)
+    if db.session.execute(update).rowcount:
+        return
+    try:
+        # The first observation of the bucket, unless another worker just inserted it
+        with db.session.begin_nested():
+            db.session.add(TimingAggregate(count=1, seconds=seconds, cpu_seconds=cpu_seconds,
+                                           peak_rss_kb=peak_rss_kb, **key))
+    except IntegrityError:
+        db.session.execute(update)
+
+
+def record_timings(reference_file, timings):
+    """
+    Adds the timings of an evaluation against `reference_file` (`timing.Recorder.summary`) to the
+    histograms of `/metrics`. The caller commits the session.
+    """
+    # The peak memory of the timings recorded before `process_peak_rss_kb` is the one of the whole process
+    peak_rss_kb = timings['peak_rss_kb'] if 'process_peak_rss_kb' in timings else None
+    observe('evaluation', reference_file, timings['wall'], timings['cpu'], peak_rss_kb)
+    for name, stage in timings['stages'].items():
+        observe('stage', name, stage['wall'], stage['cpu'])
+
+
+def rebuild_timings():
+    """
+    Aggregates again the timings stored with the submitted files, e.g. after changing `METRICS_BUCKETS`, and
+    returns their number. The evaluations replaced or deleted since are no longer counted.
+    """
+    TimingAggregate.query.delete()
+    count = 0
+    for reference_file, timings in db.session.query(SubmittedFile.reference_file, SubmittedFile.timings).filter(
+            SubmittedFile.timings.isnot(None)):
+        record_timings(reference_file, json.loads(timings))
+        count += 1
+    db.session.commit()
+    return count
+
+
+def render_metrics():
+    """
+    Returns the text of `/metrics`.
+    """
+    bounds = app.config['METRICS_BUCKETS']
+    evaluations = {}
+    stages = {}
+    stage_cpu = {}
+    peak_rss = {}
+    for row in TimingAggregate.query:
+        if row.metric == 'evaluation':
+            evaluations.setdefault(row.label, Histogram(bounds)).add(row.le, row.count, row.seconds)
+            if row.peak_rss_kb is not None:
+                peak_rss[row.label] = max(peak_rss.get(row.label, 0), row.peak_rss_kb * 1024)
+        else:
+            stages.setdefault(row.label, Histogram(bounds)).add(row.le, row.count, row.seconds)
+            stage_cpu[row.label] = stage_cpu.get(row.label, 0.0) + row.cpu_seconds
+
+    lines = ['# HELP csi_evaluation_seconds Wall time of the evaluations of the submitted files.',
+             '# TYPE csi_evaluation_seconds histogram']
+    for reference_file, histogram in sorted(evaluations.items()):
+        lines += histogram.lines('csi_evaluation_seconds', {'reference': reference_file})
+    lines += ['# HELP csi_evaluation_stage_seconds Wall time of each stage of an evaluation.',
+              '# TYPE csi_evaluation_stage_seconds histogram']
+    for name, histogram in sorted(stages.items()):
+        lines += histogram.lines('csi_evaluation_stage_seconds', {'stage': name})
+    lines += ['# HELP csi_evaluation_stage_cpu_seconds_total CPU time spent in each stage of the evaluations.',
+              '# TYPE csi_evaluation_stage_cpu_seconds_total counter']
+    lines += ['csi_evaluation_stage_cpu_seconds_total{} {!r}'.format(format_labels({'stage': name}), cpu)
+              for name, cpu in sorted(stage_cpu.items())]
+    lines += ['# HELP csi_evaluation_peak_rss_bytes Highest peak resident memory of an evaluation, in its worker.',
+              '# TYPE csi_evaluation_peak_rss_bytes gauge']
+    lines += ['csi_evaluation_peak_rss_bytes{} {}'.format(format_labels({'reference': reference_file}), rss)
+              for reference_file, rss in sorted(peak_rss.items())]
+    lines += ['# HELP csi_evaluation_jobs Jobs of the evaluation queue.',
+              '# TYPE csi_evaluation_jobs gauge']
+    lines += ['csi_evaluation_jobs{} {}'.format(format_labels({'kind': kind, 'status': status}), count)
+              for kind, status, count in db.session.query(EvaluationJob.kind, EvaluationJob.status,
+                                                          db.func.count()).group_by(
+                  EvaluationJob.kind, EvaluationJob.status).order_by(EvaluationJob.kind, EvaluationJob.status)]
+    return '\n'.join(lines) + '\n'
+
+
+@app.cli.group('metrics')
+def metrics_group():
+    """Manage the aggregated metrics of `/metrics`."""
+
+
+@metrics_group.command('rebuild')
+def metrics_rebuild():
+    """Aggregate again the timings of the submitted files, e.g. after changing METRICS_BUCKETS."""
+    click.echo('Aggregated the timings of {} files'.format(rebuild_timings()))
@@ -3,25 +3,46 @@ import urllib.parse
 from app import app, db
 from app.forms import LoginForm, RegistrationForm, EditProfileForm, UploadFileForm
 from app.models import User, SubmittedFile, del_sub_file
-from app.benchmarklib import evaluate, tab2text
-from flask import render_template, flash, redirect, url_for, request, send_file
+from app.jobs import enqueue, enqueue_profile, reuse_results, wants_preview
+from app.leaderboard import leaderboard
+from app.monitoring import render_metrics
+from flask import render_template, flash, redirect, url_for, request, send_file, jsonify, abort
 from flask_login import current_user, login_user
 from flask_login import logout_user
 from flask_login import login_required
 from werkzeug.utils import secure_filename
+import hashlib
+import json
 import os
 
 
 @app.route('/')
 @app.route('/index')
 def index():
-    best_submits = []
-    for user in User.query.all():
-        if user.best_submitted_file:
-            if user.best_submitted_file != None:
-                best_submits.append((user.username, SubmittedFile.query.filter_by(
-                    user_id=user.id).filter_by(id=user.best_submitted_file).first()))
-    return render_template('index.html', title='Home', best_submits=best_submits, users=get_all_users())
+    return render_template('index.html', title='Home', best_submits=leaderboard.best_submissions(),
+                           users=get_all_users())
+
+
+# The scores the leaderboards can be sorted by, and whether higher is better
+SCORES = {'auc_hausdorff': False, 'auc_accuracy': False, 'auc_completeness': True, 'hausdorff_low_rate': False,
+          'hausdorff_high_rate': False, 'accuracy_low_rate': False, 'accuracy_high_rate': False,
+          'bd_rate_hausdorff': False, 'bd_rate_accuracy': False}
+
+
+@app.route('/leaderboard/<reference>')
+def reference_leaderboard(reference):
+    if reference not in app.config['AVAILABLE_MODELS']:
+        abort(404)
+    sort = request.args.get('sort', 'auc_hausdorff')
+    if sort not in SCORES:
+        sort = 'auc_hausdorff'
+    column = getattr(SubmittedFile, sort)
+    page = db.session.query(SubmittedFile, User.username).join(User, User.id == SubmittedFile.user_id).filter(
+        SubmittedFile.reference_file == reference, SubmittedFile.status == 'done', column.isnot(None)).order_by(
+        column.desc() if SCORES[sort] else column.asc(), SubmittedFile.id).paginate(
+        page=request.args.get('page', 1, type=int), per_page=app.config['LEADERBOARD_PAGE_SIZE'], error_out=False)
+    return render_template('leaderboard.html', title='Leaderboard', reference=reference, sort=sort,
+                           scores=list(SCORES), page=page, users=get_all_users())
 
 
 @app.route('/login', methods=['GET', 'POST'])
@@ -58,6 +79,7 @@ def register():
         user.set_password(form.password.data)
         db.session.add(user)
         db.session.commit()
+        leaderboard.invalidate()
         flash('Congratulations, you are now a registered user !')
         return redirect(url_for('login'))
     return render_template('register.html', title='Register', form=form, users=get_all_users())
@@ -72,7 +94,9 @@ def user(username):
             id=user.best_submitted_file).first_or_404().filename
     else:
         best_sub_file = None
-    return render_template('user.html', user=user, best_submitted_file=best_sub_file, sub_files=sub_files, users=get_all_users())
+    return render_template('user.html', user=user, best_submitted_file=best_sub_file, sub_files=sub_files,
+                           evaluated_files=[s for s in sub_files if s.status == 'done' or s.provisional],
+                           users=get_all_users())
 
 
 @app.route('/edit_profile', methods=['GET', 'POST'])
@@ -87,12 +111,15 @@ def edit_profile():
         current_user.what_we_do = form.what_we_do.data
         current_user.best_submitted_file = form.best_submission.data
         db.session.commit()
+        leaderboard.invalidate()
         sub_files = SubmittedFile.query.filter_by(
             user_id=current_user.id).all()
         best_sub_file = SubmittedFile.query.filter_by(user_id=current_user.id).filter_by(
             id=current_user.best_submitted_file).first_or_404().filename
         flash('Your changes have been saved.')
-        return render_template('user.html', user=current_user, best_submitted_file=best_sub_file, sub_files=sub_files, users=get_all_users())
+        return render_template('user.html', user=current_user, best_submitted_file=best_sub_file, sub_files=sub_files,
+                               evaluated_files=[s for s in sub_files if s.status == 'done' or s.provisional],
+                               users=get_all_users())
     elif request.method == 'GET':
         form.username.data = current_user.username
         form.who_we_are.data = current_user.who_we_are
@@ -111,21 +138,27 @@ def upload_file():
         if filename == '':
             flash('No selected file')
             return redirect(url_for('upload_file'))
-        if filename in [s.filename for s in SubmittedFile.query.all()]:
+        if SubmittedFile.query.filter_by(filename=filename).first() is not None:
             flash('You need to rename your file')
             return redirect(url_for('upload_file'))
         elif filename and allowed_file(filename):
             path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            form.file.data.save(path)
-            steps, dst_list, middle_acc, middle_comp, size, declared_size = evaluate(path, reference_file)
+            content_hash = save_upload(form.file.data, path)
             submittedfile = SubmittedFile(filename=filename, reference_file=reference_file, user_id=current_user.id,
-                                          tab_absc=tab2text(steps), tab_hausdorff=tab2text(dst_list), tab_middle_accurracy=tab2text(middle_acc), tab_middle_completeness=tab2text(middle_comp), real_size=size, estimated_size=declared_size)
+                                          status='pending', content_hash=content_hash)
             db.session.add(submittedfile)
-            db.session.commit()
-            flash('Your file has been uploaded')
+            db.session.flush()
+            if reuse_results(submittedfile):
+                db.session.commit()
+                flash('Your file has been uploaded, it was already evaluated')
+            else:
+                enqueue(submittedfile, preview=wants_preview(reference_file, form.preview.data))
+                db.session.commit()
+                flash('Your file has been uploaded and will be evaluated shortly')
             if not current_user.best_submitted_file:
                 current_user.best_submitted_file = submittedfile.id
                 db.session.commit()
+            leaderboard.invalidate()
             return redirect(url_for('index'))
         else:
             flash('Wrong extension file')
@@ -148,6 +181,7 @@ def download_model(model):
 def del_sub(sub_file_id):
     sub_file = SubmittedFile.query.filter_by(id=sub_file_id).first()
     del_sub_file(sub_file)
+    leaderboard.invalidate()
     flash('Your submission has been deleted')
     return redirect(url_for('user',username=current_user.username))
 
@@ -158,11 +192,65 @@ def dlobja(model):
     # return send_from_directory(directory=app.config['UPLOAD_FOLDER'], filename=model, as_attachment=True, path='')
 
 
+@app.route('/status/<int:sub_file_id>')
+def status(sub_file_id):
+    sub_file = SubmittedFile.query.get_or_404(sub_file_id)
+    return jsonify(id=sub_file.id, filename=sub_file.filename, status=sub_file.status, progress=sub_file.progress,
+                   provisional=bool(sub_file.provisional),
+                   bounds=json.loads(sub_file.tab_bounds) if sub_file.provisional and sub_file.tab_bounds else None,
+                   surface_metrics=json.loads(sub_file.surface_metrics) if sub_file.surface_metrics else None,
+                   timings=json.loads(sub_file.timings) if sub_file.timings else None)
+
+
+@app.route('/profile/<int:sub_file_id>')
+@login_required
+def profile_submission(sub_file_id):
+    if not current_user.is_admin:
+        abort(403)
+    sub_file = SubmittedFile.query.get_or_404(sub_file_id)
+    enqueue_profile(sub_file)
+    db.session.commit()
+    flash('The next evaluation of {} will be profiled'.format(sub_file.filename))
+    return redirect(url_for('user', username=User.query.get(sub_file.user_id).username))
+
+
+@app.route('/profile/<int:sub_file_id>/<artifact>')
+@login_required
+def profile_artifact(sub_file_id, artifact):
+    from csi_eval.profiling import ARTIFACTS as PROFILE_ARTIFACTS
+    if not current_user.is_admin:
+        abort(403)
+    sub_file = SubmittedFile.query.get_or_404(sub_file_id)
+    if sub_file.profile is None or artifact not in PROFILE_ARTIFACTS:
+        abort(404)
+    path = os.path.join(app.config['PROFILE_FOLDER'], sub_file.profile, artifact)
+    if artifact.endswith('.txt'):
+        return send_file(path, mimetype='text/plain')
+    return send_file(path, as_attachment=True, download_name='{}.pstats'.format(sub_file.filename))
+
+
+@app.route('/metrics')
+def metrics():
+    return render_metrics(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+
 @app.route('/stream/<model>')
 def stream(model):
     return render_template('stream.html')
 
 
+def save_upload(file_storage, path):
+    """
+    Writes an uploaded file to `path` by chunks and returns its sha1, computed on the way.
+    """
+    sha1 = hashlib.sha1()
+    with open(path, 'wb') as file:
+        for chunk in iter(lambda: file_storage.stream.read(1 << 20), b''):
+            sha1.update(chunk)
+            file.write(chunk)
+    return sha1.hexdigest()
+
+
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower(
@@ -170,11 +258,4 @@ def allowed_file(filename):
 
 
 def get_all_users():
-    users = User.query.all()
-    return users
-
-
-def format_tabs(string_tab):
-    str_data = string_tab.split(' ')
-    float_tab = [float(strdat) for strdat in str_data]
-    return float_tab
+    return leaderboard.users()
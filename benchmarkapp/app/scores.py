@@ -0,0 +1,53 @@
+"""
+The rate-distortion scores of the submitted files (`csi_eval.scores`), computed at the end of their
+evaluation and stored in their columns, so that the leaderboards are sorted by the database. They are
+recomputed with `flask scores compute`, e.g. after a baseline of `SCORE_BASELINES` changed.
+"""
+
+import click
+from app import app, db
+from app.models import SubmittedFile
+from app.leaderboard import leaderboard
+
+
+def update_scores(submitted_file):
+    """
+    Computes the scores of an evaluated file, against the baseline of its reference if it is evaluated.
+    The caller commits the session.
+    """
+    from csi_eval.scores import compute_scores, reference_size
+    baseline = None
+    baseline_name = app.config['SCORE_BASELINES'].get(submitted_file.reference_file)
+    if baseline_name is not None:
+        baseline = SubmittedFile.query.filter_by(filename=baseline_name, status='done').first()
+    compute_scores(submitted_file, reference_size(app.config['AVAILABLE_MODELS'][submitted_file.reference_file]),
+                   baseline, app.config['SCORE_LOW_RATE'], app.config['SCORE_HIGH_RATE'],
+                   app.config['SCORE_MAX_RATE'])
+
+
+def rescore(reference=None):
+    """
+    Recomputes the scores of the evaluated files, of every reference or of `reference` only, and returns
+    their number.
+    """
+    query = SubmittedFile.query.filter_by(status='done')
+    if reference is not None:
+        query = query.filter_by(reference_file=reference)
+    sub_files = query.all()
+    for sub_file in sub_files:
+        update_scores(sub_file)
+    db.session.commit()
+    leaderboard.invalidate()
+    return len(sub_files)
+
+
+@app.cli.group('scores')
+def scores_group():
+    """Manage the rate-distortion scores of the evaluations."""
+
+
+@scores_group.command('compute')
+@click.option('--reference', default=None, help='Only the files evaluated against this reference model.')
+def scores_compute(reference):
+    """Recompute the scores of the evaluated files, e.g. after changing a baseline."""
+    click.echo('Computed the scores of {} files'.format(rescore(reference)))
@@ -14,9 +14,14 @@ class Config(object):
     MAIL_USERNAME = os.environ.get('MAIL_USERNAME')
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
     ADMINS = ['your-email@example.com']
+    # Users allowed to profile the evaluations and to download the profiles (comma-separated in the environment)
+    ADMIN_USERNAMES = set(filter(None, (os.environ.get('ADMIN_USERNAMES') or '').split(',')))
     UPLOAD_FOLDER = basedir + '/app/static/client/uploads'
     ALLOWED_EXTENSIONS = {'obj', 'obja'}
     OBJ_FOLDER = basedir + "/app/static/client/obj"
+    REFERENCE_CACHE_FOLDER = os.environ.get('REFERENCE_CACHE_FOLDER') or basedir + '/cache/references'
+    # File touched to invalidate the cached leaderboard of every process
+    LEADERBOARD_STAMP = os.environ.get('LEADERBOARD_STAMP') or basedir + '/cache/leaderboard.stamp'
     AVAILABLE_MODELS = {'icosphere': {'file': 'icosphere.obj',
                                       'watertight': True,
                                       'manifoldness': 1,
@@ -51,13 +56,70 @@ class Config(object):
                                     'watertight': True,
                                     'manifoldness': 3,
                                     'faces': 51663,
-                                    'vertices': 25926},
+                                    'vertices': 25926,
+                                    'preview': True},
                         'hippo': {'file': 'hippo.obj',
                                   'watertight': True,
                                   'manifoldness': 1,
                                   'faces': 64244,
-                                  'vertices': 32144}
+                                  'vertices': 32144,
+                                  'preview': True}
                         }
 
     TAUX_ACC = 0.9
     DIST_COMP = 0.01
+    # Also measure the last snapshot of the evaluations against the surface of the reference
+    # (`evaluation.surface_metrics`), shown with the results on `/status/<id>`
+    SURFACE_METRICS = os.environ.get('SURFACE_METRICS', '0') == '1'
+    # Number of points sampled on each surface by the sampling metrics of SURFACE_METRICS, and the seed that
+    # draws them
+    SAMPLING_BUDGET = 10000
+    SAMPLING_SEED = 0
+    # Approximate evaluation shown while the exact one runs: vertices sampled per model, confidence level of
+    # the intervals and time budget in seconds. The `preview` key of a model selects it by default.
+    PREVIEW_SAMPLES = 2000
+    PREVIEW_CONFIDENCE = 0.95
+    PREVIEW_TIME_BUDGET = 10
+    # Engine of the nearest-neighbour searches: 'kdtree', or 'blocked' to compare every pair of vertices by
+    # blocks whose distances fit in METRIC_MEMORY_LIMIT_MB megabytes
+    NEAREST_ENGINE = os.environ.get('NEAREST_ENGINE') or 'kdtree'
+    METRIC_MEMORY_LIMIT_MB = int(os.environ.get('METRIC_MEMORY_LIMIT_MB') or 256)
+    # Cache of the metric results of the snapshots already evaluated, with its maximum number of entries
+    METRIC_CACHE = os.environ.get('METRIC_CACHE', '1') == '1'
+    METRIC_CACHE_PATH = os.environ.get('METRIC_CACHE_PATH') or basedir + '/cache/metrics.sqlite'
+    METRIC_CACHE_MAX_ENTRIES = int(os.environ.get('METRIC_CACHE_MAX_ENTRIES') or 100000)
+    # Signed accuracy: negative when the reference is behind the surface of the submitted model
+    SIGNED_ACC = os.environ.get('SIGNED_ACC') == '1'
+
+    # Rates of the scores, relative to the size of the reference in OBJA: the distortions are taken at the low
+    # and high rates and the areas under the curves go up to the max rate. The BD-rates are computed against
+    # the submission named for each reference in SCORE_BASELINES, e.g. {'bunny': 'bunny_baseline.obja'}
+    SCORE_LOW_RATE = 0.25
+    SCORE_HIGH_RATE = 0.5
+    SCORE_MAX_RATE = 1.0
+    SCORE_BASELINES = {}
+    LEADERBOARD_PAGE_SIZE = 20
+    # Budget of the import of the application by a web process, in seconds (checked by `flask startup-check`)
+    STARTUP_BUDGET = float(os.environ.get('STARTUP_BUDGET') or 1.5)
+
+    EVALUATION_WORKERS = int(os.environ.get('EVALUATION_WORKERS') or 2)
+    # Processes evaluating the steps of a single submission in parallel (1 evaluates them in the worker itself)
+    EVALUATION_MAX_WORKERS = int(os.environ.get('EVALUATION_MAX_WORKERS') or 1)
+    # Update the distances of the previous step instead of recomputing them (the steps are then evaluated serially)
+    INCREMENTAL_METRICS = os.environ.get('INCREMENTAL_METRICS', '1') == '1'
+    # Record the time and memory spent in each stage of the evaluations (`csi_eval.timing`), for `/metrics`
+    STAGE_TIMINGS = os.environ.get('STAGE_TIMINGS', '1') == '1'
+    # Upper bounds of the buckets of the latency histograms of `/metrics`, in seconds
+    METRICS_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 1800)
+    # Fraction of the exact jobs profiled with cProfile and tracemalloc (`csi_eval.profiling`), besides the
+    # ones requested by an admin; the profiles are written in PROFILE_FOLDER
+    PROFILE_RATE = float(os.environ.get('PROFILE_RATE') or 0.0)
+    PROFILE_FOLDER = os.environ.get('PROFILE_FOLDER') or basedir + '/cache/profiles'
+    JOB_POLL_INTERVAL = 1.0
+    # A running job whose heartbeat is older than JOB_TIMEOUT seconds is requeued; the heartbeat is updated
+    # every JOB_HEARTBEAT_INTERVAL seconds while the job runs, whatever the length of its steps
+    JOB_TIMEOUT = 600
+    JOB_HEARTBEAT_INTERVAL = 30
+    JOB_MAX_ATTEMPTS = 3
+    # Progress of an interrupted `flask reevaluate`, resumed by the next one
+    REEVALUATE_CHECKPOINT = os.environ.get('REEVALUATE_CHECKPOINT') or basedir + '/cache/reevaluate.json'
@@ -0,0 +1,6 @@
+"""
+The evaluation of progressive 3D streams (OBJA files) against reference models, usable without the web
+application: `csi_eval.evaluation` evaluates a stream, `csi_eval.metrics` holds the metrics and
+`python -m csi_eval evaluate` is its command line.
+Nothing is imported here so that `import csi_eval` stays cheap.
+"""
@@ -0,0 +1,3 @@
+from csi_eval.cli import main
+
+main()
@@ -0,0 +1,138 @@
+"""
+The command line of the evaluation library:
+
+    python -m csi_eval evaluate stream.obja --ref bunny --json
+    python -m csi_eval evaluate stream.obja --ref path/to/model.obj --npz results.npz
+
+A reference is either the name of a model of `--models-dir` (the OBJ files of the web application by
+default) or the path of an OBJ file. With `--surface`, the last snapshot is also measured against the
+surface of the reference (`evaluation.surface_metrics`). With `--timings`, the time spent in each stage of
+the evaluation (`timing`) is printed on the error output, or added to the JSON lines. With `--profile DIR`,
+the evaluation runs under `profiling.profile` and its artifacts are written in DIR (in a folder per file if
+several).
+"""
+
+import argparse
+import json
+import os
+import sys
+import numpy as np
+from contextlib import nullcontext
+from csi_eval import evaluation, profiling, timing
+from csi_eval.metrics import nearest
+from csi_eval.metric_cache import MetricCache
+from csi_eval.reference import ReferenceCache
+
+DEFAULT_MODELS_DIR = os.environ.get('CSI_EVAL_MODELS') or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app', 'static', 'client', 'obj')
+
+
+def reference_cache_for(ref, models_dir, cache_dir=None):
+    """
+    Returns a `reference.ReferenceCache` holding the reference `ref`, and the name of the reference in it.
+    """
+    path = ref if ref.endswith('.obj') or os.path.sep in ref else os.path.join(models_dir, ref + '.obj')
+    if not os.path.isfile(path):
+        raise FileNotFoundError("No reference model {}".format(path))
+    name = os.path.splitext(os.path.basename(path))[0]
+    models = {name: {'file': os.path.basename(path)}}
+    return ReferenceCache(os.path.dirname(os.path.abspath(path)), models, cache_dir), name
+
+
+def evaluate_command(args):
+    nearest.configure(args.engine, args.memory_limit)
+    reference_cache, name = reference_cache_for(args.ref, args.models_dir, args.cache_dir)
+    metric_cache = None
+    if args.metric_cache:
+        metric_cache = MetricCache(args.metric_cache)
+    status = 0
+    for path in args.files:
+        try:
+            with timing.record() if args.timings else nullcontext() as recorder, \
+                    profiling.profile() if args.profile else nullcontext() as profile:
+                file_evaluation = evaluation.Evaluation(path, reference_cache, name, args.dist_comp, args.taux_acc,
+                                                        args.workers, not args.no_incremental, args.signed,
+                                                        metric_cache, args.surface, args.samples, args.seed)
+                steps, haus, middle_acc, middle_comp = [], [], [], []
+                for step, step_haus, step_acc, step_comp in file_evaluation:
+                    steps.append(step)
+                    haus.append(step_haus)
+                    middle_acc.append(step_acc)
+                    middle_comp.append(step_comp)
+                size, declared_size = file_evaluation.size, file_evaluation.declared_size
+            if profile is not None:
+                profile.save(args.profile if len(args.files) == 1 else os.path.join(
+                    args.profile, os.path.splitext(os.path.basename(path))[0]))
+        except (OSError, ValueError) as e:
+            print("{}: {}".format(path, e), file=sys.stderr)
+            status = 1
+            continue
+        if args.npz:
+            output = args.npz if len(args.files) == 1 else "{}-{}.npz".format(
+                os.path.splitext(args.npz)[0], os.path.splitext(os.path.basename(path))[0])
+            np.savez(output, steps=steps, hausdorff=haus, accuracy=middle_acc, completeness=middle_comp,
+                     size=size, declared_size=declared_size if declared_size is not None else -1)
+        timings = recorder.summary() if recorder is not None else None
+        if args.json:
+            row = {'file': path, 'reference': name, 'size': size, 'declared_size': declared_size, 'steps': steps,
+                   'hausdorff': haus, 'accuracy': middle_acc, 'completeness': middle_comp}
+            if file_evaluation.surface_metrics is not None:
+                row['surface_metrics'] = file_evaluation.surface_metrics
+            if timings is not None:
+                row['timings'] = timings
+            print(json.dumps(row))
+        elif not args.npz:
+            print("{}: {} steps, {} bytes, final hausdorff {:.6g}, accuracy {:.6g}, completeness {:.6g}".format(
+                path, len(steps), size, haus[-1], middle_acc[-1], middle_comp[-1]) if steps else
+                  "{}: no step".format(path))
+            if file_evaluation.surface_metrics is not None:
+                print("{}: surface metrics {}".format(path, json.dumps(file_evaluation.surface_metrics)))
+        if timings is not None and not args.json:
+            for stage, totals in sorted(timings['stages'].items(), key=lambda item: -item[1]['wall']):
+                print("{}: {:<12} {:8.3f}s wall {:8.3f}s cpu {:6d} calls".format(
+                    path, stage, totals['wall'], totals['cpu'], totals['calls']), file=sys.stderr)
+    return status
+
+
+def parser():
+    main_parser = argparse.ArgumentParser(prog='python -m csi_eval',
+                                          description="Evaluates progressive 3D streams against reference models.")
+    commands = main_parser.add_subparsers(dest='command', required=True)
+    evaluate = commands.add_parser('evaluate', help="evaluate OBJA files")
+    evaluate.add_argument('files', nargs='+', help="the OBJA files")
+    evaluate.add_argument('--ref', required=True, help="a model name of --models-dir, or the path of an OBJ file")
+    evaluate.add_argument('--models-dir', default=DEFAULT_MODELS_DIR,
+                          help="the folder of the reference models (env CSI_EVAL_MODELS)")
+    evaluate.add_argument('--dist-comp', type=float, default=evaluation.DIST_COMP,
+                          help="the completeness distance, relative to the diagonal of the reference")
+    evaluate.add_argument('--taux-acc', type=float, default=evaluation.TAUX_ACC, help="the accuracy quantile")
+    evaluate.add_argument('--signed', action='store_true', help="signed accuracy")
+    evaluate.add_argument('--no-incremental', action='store_true',
+                          help="evaluate every step from scratch instead of updating the previous one")
+    evaluate.add_argument('--workers', type=int, default=1,
+                          help="processes evaluating the steps in parallel (with --no-incremental)")
+    evaluate.add_argument('--surface', action='store_true',
+                          help="also measure the last snapshot against the surface of the reference")
+    evaluate.add_argument('--samples', type=int, default=evaluation.SAMPLING_BUDGET,
+                          help="points sampled on each surface by --surface")
+    evaluate.add_argument('--seed', type=int, default=evaluation.SAMPLING_SEED, help="seed of the sampled points")
+    evaluate.add_argument('--engine', choices=['kdtree', 'blocked'], default='kdtree',
+                          help="the nearest-neighbour engine")
+    evaluate.add_argument('--memory-limit', type=int, default=256, help="memory cap of the blocked engine, in MB")
+    evaluate.add_argument('--cache-dir', help="where to publish the arrays of the reference (not published if unset)")
+    evaluate.add_argument('--metric-cache', help="SQLite file caching the results of the steps")
+    evaluate.add_argument('--json', action='store_true', help="print one JSON line per file")
+    evaluate.add_argument('--timings', action='store_true', help="measure the time spent in each stage")
+    evaluate.add_argument('--profile', metavar='DIR', help="profile the evaluation and write the profile in DIR")
+    evaluate.add_argument('--npz', help="write the curves in this NPZ file (suffixed by the stream name if several)")
+    evaluate.set_defaults(func=evaluate_command)
+    return main_parser
+
+
+def main(argv=None):
+    args = parser().parse_args(argv)
+    try:
+        sys.exit(args.func(args))
+    except FileNotFoundError as e:
+        print(e, file=sys.stderr)
+        sys.exit(2)
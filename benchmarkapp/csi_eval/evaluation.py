@@ -0,0 +1,365 @@
+"""
+Evaluation of the OBJA files against the reference models, independent of the web application: the
+references and the metric cache are given explicitly, and the defaults of the parameters are those of
+`config.Config`.
+"""
+
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+import numpy as np
+from csi_eval import timing
+from csi_eval.obja import Model as ObjaModel
+from csi_eval.metrics.hausdorff import hausdorff
+from csi_eval.metrics.incremental import IncrementalMetrics
+from csi_eval.metrics.middleburry import middlebury
+from csi_eval.metrics import nearest
+from csi_eval.metrics.nearest import build_index
+from csi_eval.metrics.preview import preview_snapshot
+from csi_eval.metrics.sampling import metro
+from csi_eval.metrics.surface import surface_hausdorff
+from csi_eval.metric_cache import params_version, snapshot_key
+
+# Default parameters of the metrics
+TAUX_ACC = 0.9
+DIST_COMP = 0.01
+SAMPLING_BUDGET = 10000
+SAMPLING_SEED = 0
+PREVIEW_SAMPLES = 2000
+PREVIEW_CONFIDENCE = 0.95
+PREVIEW_TIME_BUDGET = 10
+
+
+def evaluate_snapshot(reference, vert_list, faces_list, dist_comp, taux_acc, signed=False):
+    """
+    Computes the hausdorff distance, the middlebury accuracy (signed with `signed`) and the middlebury
+    completeness of one snapshot against a cached reference.
+    """
+    # The snapshot index is shared by hausdorff and the middlebury accuracy
+    with timing.stage('index'):
+        compressed_index = build_index(vert_list)
+    with timing.stage('hausdorff'):
+        haus = hausdorff(vert_list, reference.vertices, original_index=compressed_index)
+    res = middlebury(reference.vertices, reference.faces, vert_list, faces_list, taux_acc=taux_acc,
+                     dist_comp=dist_comp * reference.diagonal,
+                     modelr_index=reference.index, modelg_index=compressed_index, signed=signed)
+    return haus, res[0], res[1]
+
+
+def evaluate_snapshot_surface(reference, vert_list, faces_list, samples=SAMPLING_BUDGET, seed=SAMPLING_SEED):
+    """
+    Computes the symmetric hausdorff distance, the RMS error and the mean error between the surfaces of
+    a snapshot and of a cached reference, from `samples` points drawn on each of them.
+    """
+    return metro(reference.vertices, reference.faces, vert_list, faces_list, samples=samples, seed=seed,
+                 modelr_index=reference.surface_index)
+
+
+def surface_metrics(reference, vert_list, faces_list, samples=SAMPLING_BUDGET, seed=SAMPLING_SEED):
+    """
+    Computes the metrics of a snapshot against the surface of a cached reference, as a dict ready for JSON:
+    `vertex_hausdorff` is the largest distance from a vertex of the snapshot to the surface of the
+    reference (`surface.surface_hausdorff`), None for a snapshot without vertices. `metro_hausdorff`,
+    `metro_rms` and `metro_mean` are those of `evaluate_snapshot_surface`, None for a snapshot without area.
+    """
+    metrics = {'vertex_hausdorff': None, 'metro_hausdorff': None, 'metro_rms': None, 'metro_mean': None}
+    with timing.stage('surface'):
+        if len(vert_list):
+            metrics['vertex_hausdorff'] = float(surface_hausdorff(vert_list, index=reference.surface_index))
+        try:
+            haus, rms, mean = evaluate_snapshot_surface(reference, vert_list, faces_list, samples, seed)
+        except ValueError:
+            return metrics
+    metrics.update(metro_hausdorff=float(haus), metro_rms=float(rms), metro_mean=float(mean))
+    return metrics
+
+
+# The reference of the evaluation a pool worker process is dedicated to
+worker_reference = None
+
+
+def init_worker(reference_cache, reference_file, engine='kdtree', memory_limit_mb=256):
+    """
+    Initializes a pool worker process with its reference and the nearest-neighbour engine of the parent.
+    The reference is taken from `reference_cache` (inherited with the references it holds when the pool
+    forks, else loading them from its disk cache) instead of being pickled with every task.
+    """
+    global worker_reference
+    nearest.configure(engine, memory_limit_mb)
+    worker_reference = reference_cache.get(reference_file)
+
+
+def evaluate_worker_snapshot(vert_list, faces_list, dist_comp, taux_acc, signed):
+    """
+    Evaluates a snapshot in a pool worker process.
+    """
+    return evaluate_snapshot(worker_reference, vert_list, faces_list, dist_comp, taux_acc, signed)
+
+
+class Evaluation:
+    """
+    The evaluation of an OBJA file against a reference model, computed step by step while the file is
+    parsed: iterating over it yields (step, hausdorff, accuracy, completeness) as soon as each step is
+    reached, and only the current snapshot is in memory.
+    With `incremental`, the distances of each step are updated from those of the previous step with the
+    vertices inserted or moved in between (`metrics.incremental`).
+    With `signed`, the accuracy is the signed distance of `middleburry.middlebury_accuracy`.
+    Otherwise, with `max_workers` above 1, the steps are evaluated in parallel by a pool of processes; the
+    results are still yielded in step order and only a few snapshots per worker are in flight.
+    With a `metric_cache` (a `metric_cache.MetricCache`), the results of the snapshots already evaluated
+    are taken from it; `cache_hits` and `cache_misses` count the steps found there or not.
+    With `surface`, the last snapshot is also measured against the surface of the reference, with `samples`
+    points drawn from `seed` on each surface (`surface_metrics`); the results are then in `surface_metrics`.
+    The reference `reference_file` is taken from `reference_cache` (a `reference.ReferenceCache`).
+    """
+
+    def __init__(self, input_obja, reference_cache, reference_file, dist_comp=DIST_COMP, taux_acc=TAUX_ACC,
+                 max_workers=1, incremental=True, signed=False, metric_cache=None, surface=False,
+                 samples=SAMPLING_BUDGET, seed=SAMPLING_SEED):
+        self.input_obja = input_obja
+        self.reference_cache = reference_cache
+        self.reference_file = reference_file
+        self.dist_comp = dist_comp
+        self.taux_acc = taux_acc
+        self.max_workers = max_workers
+        self.incremental = incremental
+        self.signed = signed
+        self.metric_cache = metric_cache
+        self.surface = surface
+        self.samples = samples
+        self.seed = seed
+        self.surface_metrics = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.last_key = None
+        self.last_results = None
+        self.model = ObjaModel()
+
+    def parse(self, reference):
+        """
+        Parses the file step by step (`obja.Model.iter_parse`), measuring the surface metrics of the last
+        snapshot with `surface`.
+        """
+        for rank, (step, vert_list, faces_list) in enumerate(timing.timed('parse',
+                                                                          self.model.iter_parse(self.input_obja))):
+            if self.surface and rank == self.model.step_count - 1:
+                self.surface_metrics = surface_metrics(reference, vert_list, faces_list, self.samples, self.seed)
+            yield step, vert_list, faces_list
+
+    def lookup(self, reference, vert_list, faces_list):
+        """
+        Returns the cache key of a snapshot and its cached results, or None if they are not cached.
+        A step without change since the previous one is answered without querying the cache.
+        """
+        if self.metric_cache is None:
+            return None, None
+        with timing.stage('cache'):
+            key = snapshot_key(reference, vert_list, faces_list, self.dist_comp, self.taux_acc, self.signed)
+            results = self.last_results if key == self.last_key else self.metric_cache.get(key)
+        if results is None:
+            self.cache_misses += 1
+        else:
+            self.cache_hits += 1
+            self.remember(key, results)
+        return key, results
+
+    def remember(self, key, results, store=False):
+        """
+        Keeps the results of the last snapshot, and stores them in the cache if they were computed.
+        """
+        # The results of a step submitted to the pool are kept as their future
+        self.last_key = key
+        self.last_results = results if isinstance(results, Future) else tuple(results)
+        if store and key is not None:
+            with timing.stage('cache'):
+                self.metric_cache.put(key, results)
+
+    @property
+    def use_cache(self):
+        return self.metric_cache is not None
+
+    @property
+    def params_version(self):
+        return params_version(self.dist_comp, self.taux_acc, self.signed)
+
+    def __iter__(self):
+        try:
+            yield from self.iter_steps()
+        finally:
+            # The hits of the evaluation are recorded in the cache at once
+            if self.metric_cache is not None:
+                self.metric_cache.flush()
+
+    def iter_steps(self):
+        with timing.stage('reference'):
+            reference = self.reference_cache.get(self.reference_file)
+        if self.incremental:
+            metrics = IncrementalMetrics(reference, self.dist_comp, self.taux_acc, signed=self.signed)
+            # The changes of the steps answered by the cache, still to be given to `metrics`
+            skipped_changes = []
+            for step, vert_list, faces_list in self.parse(reference):
+                vertex_indices, _ = self.model.step_changes
+                key, results = self.lookup(reference, vert_list, faces_list)
+                if results is None:
+                    if skipped_changes:
+                        vertex_indices = np.unique(np.concatenate(skipped_changes + [vertex_indices]))
+                        skipped_changes = []
+                    results = metrics.update(vert_list, vertex_indices, faces_list)
+                    self.remember(key, results, store=True)
+                else:
+                    skipped_changes.append(np.asarray(vertex_indices, dtype=np.int64))
+                yield (step,) + tuple(results)
+            return
+
+        if self.max_workers is None or self.max_workers <= 1:
+            for step, vert_list, faces_list in self.parse(reference):
+                key, results = self.lookup(reference, vert_list, faces_list)
+                if results is None:
+                    results = evaluate_snapshot(reference, vert_list, faces_list, self.dist_comp, self.taux_acc,
+                                                self.signed)
+                    self.remember(key, results, store=True)
+                yield (step,) + tuple(results)
+            return
+
+        with ProcessPoolExecutor(max_workers=self.max_workers, initializer=init_worker,
+                                 initargs=(self.reference_cache, self.reference_file, nearest.ENGINE,
+                                           nearest.MEMORY_LIMIT_MB)) as executor:
+            pending = deque()
+            for step, vert_list, faces_list in self.parse(reference):
+                key, results = self.lookup(reference, vert_list, faces_list)
+                if results is None:
+                    # The parser reuses its buffers and the tasks are pickled later on: copy the snapshot now
+                    results = executor.submit(evaluate_worker_snapshot, vert_list.copy(), faces_list.copy(),
+                                              self.dist_comp, self.taux_acc, self.signed)
+                    # An unchanged next step waits for the same future
+                    self.remember(key, results)
+                else:
+                    key = None
+                pending.append((step, key, results))
+                if len(pending) >= 2 * self.max_workers:
+                    yield self.collect(*pending.popleft())
+            while pending:
+                yield self.collect(*pending.popleft())
+
+    def collect(self, step, key, results):
+        """
+        Returns the row of a step evaluated by the pool, waiting for its results if they are a future, and
+        caches them if the step was submitted (`key` is then its cache key).
+        """
+        if isinstance(results, Future):
+            with timing.stage('pool'):
+                results = results.result()
+        if self.metric_cache is not None and key is not None:
+            with timing.stage('cache'):
+                self.metric_cache.put(key, results)
+        return (step,) + tuple(results)
+
+    @property
+    def step_count(self):
+        """
+        The number of steps of the file, known once the iteration has started.
+        """
+        return self.model.step_count
+
+    @property
+    def size(self):
+        return self.model.size
+
+    @property
+    def declared_size(self):
+        return self.model.declared_size
+
+
+def evaluate(input_obja, reference_cache, reference_file, dist_comp=DIST_COMP, taux_acc=TAUX_ACC, max_workers=1,
+             incremental=True, signed=False, metric_cache=None):
+    """
+    Evaluates a whole OBJA file and returns the lists of the steps, the hausdorff distances, the accuracies
+    and the completenesses, with the size of the file and its declared size.
+    """
+    steps = []
+    haus = []
+    middle_acc = []
+    middle_comp = []
+    evaluation = Evaluation(input_obja, reference_cache, reference_file, dist_comp, taux_acc, max_workers, incremental,
+                            signed, metric_cache)
+    for step, step_haus, step_acc, step_comp in evaluation:
+        steps.append(step)
+        haus.append(step_haus)
+        middle_acc.append(step_acc)
+        middle_comp.append(step_comp)
+    return steps, haus, middle_acc, middle_comp, evaluation.size, evaluation.declared_size
+
+
+class PreviewEvaluation:
+    """
+    The approximate evaluation of an OBJA file against a reference model, from `samples` reference vertices
+    and `samples` vertices of each snapshot (`metrics.preview`). Iterating over it yields
+    (step, hausdorff, accuracy, completeness, bounds) where the bounds are the
+    ((lower, upper), ...) intervals of the three metrics, at the `confidence` level for the accuracy and
+    the completeness and for sure for the hausdorff distance.
+    The evaluation keeps within `time_budget` seconds by skipping the steps it has no time for (the last
+    step is always evaluated).
+    """
+
+    def __init__(self, input_obja, reference_cache, reference_file, dist_comp=DIST_COMP, taux_acc=TAUX_ACC,
+                 samples=PREVIEW_SAMPLES, confidence=PREVIEW_CONFIDENCE, time_budget=PREVIEW_TIME_BUDGET,
+                 seed=SAMPLING_SEED):
+        self.input_obja = input_obja
+        self.reference_cache = reference_cache
+        self.reference_file = reference_file
+        self.dist_comp = dist_comp
+        self.taux_acc = taux_acc
+        self.samples = samples
+        self.confidence = confidence
+        self.time_budget = time_budget
+        self.seed = seed
+        self.skipped = 0
+        self.model = ObjaModel()
+
+    def __iter__(self):
+        reference = self.reference_cache.get(self.reference_file)
+        sample = reference.sample(self.samples, self.seed)
+        start = time.monotonic()
+        rng = np.random.default_rng(self.seed)
+        for rank, (step, vert_list, faces_list) in enumerate(self.model.iter_parse(self.input_obja)):
+            last = rank == self.model.step_count - 1
+            if not last and time.monotonic() - start > self.time_budget * (rank + 1) / self.model.step_count:
+                self.skipped += 1
+                continue
+            estimates, bounds = preview_snapshot(sample, reference.index, vert_list, faces_list,
+                                                 self.dist_comp * reference.diagonal, self.taux_acc, self.samples,
+                                                 rng, self.confidence)
+            yield (step,) + estimates + (bounds,)
+
+    @property
+    def step_count(self):
+        return self.model.step_count
+
+    @property
+    def size(self):
+        return self.model.size
+
+    @property
+    def declared_size(self):
+        return self.model.declared_size
+
+
+def evaluate_preview(input_obja, reference_cache, reference_file, dist_comp=DIST_COMP, taux_acc=TAUX_ACC,
+                     samples=PREVIEW_SAMPLES, confidence=PREVIEW_CONFIDENCE, time_budget=PREVIEW_TIME_BUDGET):
+    """
+    The approximate version of `evaluate`, which also returns the bounds of every estimate.
+    """
+    steps = []
+    haus = []
+    middle_acc = []
+    middle_comp = []
+    bounds = []
+    evaluation = PreviewEvaluation(input_obja, reference_cache, reference_file, dist_comp, taux_acc, samples, confidence,
+                                   time_budget)
+    for step, step_haus, step_acc, step_comp, step_bounds in evaluation:
+        steps.append(step)
+        haus.append(step_haus)
+        middle_acc.append(step_acc)
+        middle_comp.append(step_comp)
+        bounds.append(step_bounds)
+    return steps, haus, middle_acc, middle_comp, bounds, evaluation.size, evaluation.declared_size
@@ -0,0 +1,173 @@
+"""
+Results of the metrics already computed for a snapshot, so that a snapshot seen before (a step without
+geometric change, or a file submitted again) is not evaluated twice.
+The results are stored in a SQLite file shared by the processes of the host, keyed by the reference, the
+parameters of the metrics and a hash of the snapshot arrays, and the least recently used ones are evicted
+beyond a maximum number of entries. The uses of the entries are recorded by batches rather than by a write
+per hit.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import numpy as np
+
+# Changed whenever the metrics change, so that results computed by a previous version are not reused
+KEY_VERSION = 1
+# Number of insertions of a process between two evictions
+EVICTION_INTERVAL = 256
+# Number of entries hit by a process whose uses are recorded at once
+TOUCH_INTERVAL = 256
+
+logger = logging.getLogger(__name__)
+
+
+def params_version(dist_comp, taux_acc, signed):
+    """
+    Returns the version of the metric results computed with the given parameters, stored with the curves
+    to find the ones a change of the metrics or of their parameters made stale.
+    """
+    return "{}:{!r}:{!r}:{}".format(KEY_VERSION, float(dist_comp), float(taux_acc), int(bool(signed)))
+
+
+def snapshot_key(reference, vert_list, faces_list, dist_comp, taux_acc, signed):
+    """
+    Returns the key of the results of a snapshot: the sha1 of the reference hash, of the parameters and of
+    the bytes of the vertex and face arrays.
+    """
+    sha1 = hashlib.sha1("{}|{}|{!r}|{!r}|{}".format(KEY_VERSION, reference.digest, float(dist_comp),
+                                                   float(taux_acc), bool(signed)).encode())
+    for array, dtype in ((vert_list, np.float64), (faces_list, np.int64)):
+        array = np.ascontiguousarray(array, dtype=dtype)
+        sha1.update(str(array.shape).encode())
+        sha1.update(memoryview(array).cast("B"))
+    return sha1.hexdigest()
+
+
+class MetricCache:
+    """
+    The cache of the metric results of the snapshots, in the SQLite file `path`, brought back to
+    `max_entries` entries every `EVICTION_INTERVAL` insertions. Each process opens its own connection on
+    first use.
+    The hits are kept in `touched` until the next insertion, `TOUCH_INTERVAL` entries or `flush`, which
+    record them in a single transaction.
+    """
+
+    def __init__(self, path, max_entries=100000):
+        self.path = path
+        self.max_entries = max_entries
+        self.connection = None
+        self.pid = None
+        self.lock = threading.Lock()
+        self.insertions = 0
+        self.touched = {}
+        self.hits = 0
+        self.misses = 0
+
+    def connect(self):
+        """
+        Returns the connection of the current process, creating the file and its table if needed.
+        """
+        if self.connection is None or self.pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self.connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            # The result columns have no type, so that integer results (0 without faces) stay integers
+            self.connection.execute("CREATE TABLE IF NOT EXISTS metrics (key TEXT PRIMARY KEY, hausdorff, accuracy, "
+                                    "completeness, used REAL, hits INTEGER DEFAULT 0)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS metrics_used ON metrics (used)")
+            self.connection.commit()
+            self.pid = os.getpid()
+            # The hits of the parent process are recorded by the parent
+            self.touched = {}
+        return self.connection
+
+    def get(self, key):
+        """
+        Returns the (hausdorff, accuracy, completeness) stored for `key`, or None.
+        """
+        with self.lock:
+            connection = self.connect()
+            row = connection.execute("SELECT hausdorff, accuracy, completeness FROM metrics WHERE key = ?",
+                                     (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.touched[key] = self.touched.get(key, 0) + 1
+            if len(self.touched) >= TOUCH_INTERVAL:
+                self.write_touched()
+                connection.commit()
+            return row
+
+    def write_touched(self):
+        """
+        Records the uses of the entries hit since the last call, in the current transaction.
+        """
+        if self.touched:
+            now = time.time()
+            self.connect().executemany("UPDATE metrics SET used = ?, hits = hits + ? WHERE key = ?",
+                                       [(now, count, key) for key, count in self.touched.items()])
+            self.touched = {}
+
+    def flush(self):
+        """
+        Records the uses of the entries hit since the last write, e.g. at the end of an evaluation.
+        """
+        with self.lock:
+            if self.touched:
+                self.write_touched()
+                self.connect().commit()
+
+    def put(self, key, results):
+        """
+        Stores the (hausdorff, accuracy, completeness) of `key`.
+        """
+        with self.lock:
+            connection = self.connect()
+            self.write_touched()
+            connection.execute("INSERT OR REPLACE INTO metrics (key, hausdorff, accuracy, completeness, used) "
+                               "VALUES (?, ?, ?, ?, ?)", (key,) + tuple(np.asarray(value).item() for value in results)
+                               + (time.time(),))
+            connection.commit()
+            self.insertions += 1
+            if self.insertions % EVICTION_INTERVAL == 0:
+                self.evict()
+
+    def evict(self):
+        """
+        Removes the least recently used entries beyond `max_entries`.
+        """
+        connection = self.connect()
+        count, = connection.execute("SELECT COUNT(*) FROM metrics").fetchone()
+        if count > self.max_entries:
+            connection.execute("DELETE FROM metrics WHERE key IN (SELECT key FROM metrics ORDER BY used LIMIT ?)",
+                               (count - self.max_entries,))
+            connection.commit()
+            logger.info("Evicted %d metric results", count - self.max_entries)
+
+    def clear(self):
+        """
+        Removes every entry.
+        """
+        with self.lock:
+            connection = self.connect()
+            connection.execute("DELETE FROM metrics")
+            connection.commit()
+            self.touched = {}
+
+    def stats(self):
+        """
+        Returns the hit/miss counters of the process and the entries of the file with the hits they got.
+        """
+        self.flush()
+        with self.lock:
+            entries, hits = self.connect().execute("SELECT COUNT(*), COALESCE(SUM(hits), 0) FROM metrics").fetchone()
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': entries, 'max_entries': self.max_entries, 'stored_hits': hits,
+                'size': os.path.getsize(self.path) if os.path.exists(self.path) else 0}
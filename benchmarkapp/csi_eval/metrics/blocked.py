@@ -0,0 +1,69 @@
+"""
+Nearest-neighbour searches by brute force, with the distance matrix computed by blocks of rows.
+Each block is reduced to its minimum and argmin before the next one is computed, so the whole matrix never
+exists and the memory stays under a cap whatever the size of the models. This is the fallback of the
+KD-tree of `nearest.build_index`, and the kernel for metrics that need the pairwise distances.
+"""
+
+import numpy as np
+from scipy.spatial.distance import cdist
+
+# Bytes used per distance of a block: the float64 distance and the temporaries of `cdist`
+BYTES_PER_DISTANCE = 16
+# Size of the blocks that keeps them in the processor caches: larger blocks are slower, not faster
+BLOCK_TARGET_MB = 16
+
+
+def block_rows(query_count, target_count, memory_limit_mb):
+    """
+    Returns the number of query rows of a block of distances to `target_count` targets: the block stays
+    under `BLOCK_TARGET_MB`, and under `memory_limit_mb` megabytes together with the arrays of the
+    `query_count` results. At least 1.
+    """
+    results = query_count * 16 + target_count * 24
+    budget = min(BLOCK_TARGET_MB * 2 ** 20, memory_limit_mb * 2 ** 20 - results)
+    return max(1, int(budget) // (max(target_count, 1) * BYTES_PER_DISTANCE))
+
+
+def blocked_nearest(query_vertices, target_vertices, memory_limit_mb=256, distance_upper_bound=np.inf):
+    """
+    Returns, for every vertex of `query_vertices`, the euclidean distance to the closest vertex of
+    `target_vertices` and the index of that vertex, like `np.amin(cdist(query, target), axis=1)` and
+    `np.argmin`, computing the distances by blocks sized from `memory_limit_mb`.
+    The vertices without target closer than `distance_upper_bound` get an infinite distance and the index
+    `len(target_vertices)`, like `scipy.spatial.cKDTree.query`.
+    """
+    query = np.asarray(query_vertices, dtype=np.float64).reshape(-1, 3)
+    target = np.asarray(target_vertices, dtype=np.float64).reshape(-1, 3)
+    distances = np.empty(len(query))
+    indices = np.empty(len(query), dtype=np.int64)
+    rows = block_rows(len(query), len(target), memory_limit_mb)
+    for start in range(0, len(query), rows):
+        # Squared distances: the square root is only taken on the minima
+        block = cdist(query[start:start + rows], target, "sqeuclidean")
+        closest = np.argmin(block, axis=1)
+        indices[start:start + rows] = closest
+        distances[start:start + rows] = block[np.arange(len(closest)), closest]
+    np.sqrt(distances, out=distances)
+    beyond = distances >= distance_upper_bound
+    distances[beyond] = np.inf
+    indices[beyond] = len(target)
+    return distances, indices
+
+
+class BlockedIndex:
+    """
+    The brute force counterpart of the KD-tree returned by `nearest.build_index`: it only keeps the
+    vertices, and answers the same nearest-neighbour queries with `blocked_nearest`.
+    """
+
+    def __init__(self, vertices, memory_limit_mb=256):
+        self.data = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+        self.n = len(self.data)
+        self.memory_limit_mb = memory_limit_mb
+
+    def query(self, points, distance_upper_bound=np.inf):
+        """
+        Returns the distance and the index of the closest vertex of every point, as `cKDTree.query`.
+        """
+        return blocked_nearest(points, self.data, self.memory_limit_mb, distance_upper_bound)
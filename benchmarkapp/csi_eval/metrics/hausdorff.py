@@ -0,0 +1,77 @@
+import numpy as np
+from csi_eval.metrics.nearest import build_index, nearest_distances
+
+# Number of points whose exact distances give the first lower bound, then of points tested at once
+FIRST_CHUNK = 256
+CHUNK = 4096
+
+
+def directed_hausdorff(query_vertices, target_vertices=None, index=None, seed=0):
+    """
+    Computes the largest distance from a vertex of `query_vertices` to its closest vertex of
+    `target_vertices` (or of the prebuilt `index`), without computing every one of these distances.
+    The exact distances of a random sample of the vertices (drawn from `seed`) give a lower bound of the
+    maximum. A vertex that has a target vertex closer than that bound cannot raise the maximum: most of
+    them are rejected at once by looking up a grid of the target vertices whose cells are smaller than
+    the bound, the others are searched with the search stopped at the bound, and only those that are
+    further than it are searched fully.
+    The result is exactly the maximum of `nearest.nearest_distances`.
+    It serves the evaluations of the snapshots from scratch: the incremental evaluation
+    (`incremental.IncrementalMetrics`) keeps every one of these distances for its other metrics, and takes
+    their maximum instead.
+    """
+    if index is None:
+        index = build_index(target_vertices)
+    query = np.asarray(query_vertices, dtype=np.float64).reshape(-1, 3)
+    if len(query) <= FIRST_CHUNK:
+        distances, _ = nearest_distances(query, index=index)
+        return np.amax(distances)
+
+    query = query[np.random.default_rng(seed).permutation(len(query))]
+    distances, _ = nearest_distances(query[:FIRST_CHUNK], index=index)
+    cmax = np.amax(distances)
+    query = query[FIRST_CHUNK:]
+    query = query[~grid_neighbours(query, index.data, cmax / 2)]
+    for start in range(0, len(query), CHUNK):
+        chunk = query[start:start + CHUNK]
+        # The search returns inf for the vertices without target vertex within `cmax`
+        bounded, _ = index.query(chunk, distance_upper_bound=cmax)
+        candidates = chunk[np.isinf(bounded)]
+        if len(candidates):
+            distances, _ = nearest_distances(candidates, index=index)
+            cmax = max(cmax, np.amax(distances))
+    return cmax
+
+
+def grid_neighbours(points, targets, size):
+    """
+    Returns, for each point, whether a target is in the same cell of the grid of cells of side `size`:
+    the distance between them is then at most `size * sqrt(3)`.
+    All False if the grid would have too many cells to be indexed.
+    """
+    origin = np.minimum(np.min(points, axis=0), np.min(targets, axis=0))
+    extent = np.maximum(np.max(points, axis=0), np.max(targets, axis=0)) - origin
+    if not size > 0 or np.prod(extent / size + 1) >= 2 ** 62:
+        return np.zeros(len(points), dtype=bool)
+    dims = (extent / size).astype(np.int64) + 1
+
+    def keys(vertices):
+        cells = np.minimum(((vertices - origin) / size).astype(np.int64), dims - 1)
+        return (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+
+    return np.isin(keys(points), keys(targets))
+
+
+def symmetric_hausdorff(model1_vertices, model2_vertices, model1_index=None, model2_index=None, seed=0):
+    """
+    Computes the symmetric hausdorff distance between the vertices of two models: the largest of the
+    two directed distances.
+    """
+    return max(directed_hausdorff(model1_vertices, model2_vertices, index=model2_index, seed=seed),
+               directed_hausdorff(model2_vertices, model1_vertices, index=model1_index, seed=seed))
+
+
+# Compute the Hausdorff metrics between two meshes
+def hausdorff(original_model_vertices, compressed_model_vertices, original_index=None):
+    # For each compressed vertex, distance to the closest original vertex (optionally with a prebuilt index)
+    return directed_hausdorff(compressed_model_vertices, original_model_vertices, index=original_index)
@@ -0,0 +1,219 @@
+"""
+Incremental evaluation of the successive snapshots of a progressive mesh.
+Between two consecutive steps only a few vertices are inserted or moved, so instead of recomputing every
+nearest-neighbour distance, the distances of the previous step are kept and only the entries affected by
+the changed vertices are updated.
+"""
+
+import math
+import numpy as np
+from csi_eval import timing
+from csi_eval.metrics.middleburry import normales_sommets
+from csi_eval.metrics.nearest import build_index, nearest_distances
+
+# Average number of reference vertices per cell of the grid used to find the vertices a change can reach
+CELL_SIZE = 16
+
+
+class IncrementalMetrics:
+    """
+    Keeps, for every vertex of the reference, the distance to (and the index of) the closest vertex of the
+    current snapshot, and for every vertex of the snapshot whether it is close enough to the reference.
+    `update` gives the same hausdorff distance, middlebury accuracy and middlebury completeness as
+    evaluating the snapshot from scratch, for a cost proportional to the amount of change.
+    To find the reference vertices a changed vertex can get closer to, the reference is divided in a grid
+    of cells that keep an upper bound of the distances of their vertices: only the cells nearer to the
+    changed vertex than their bound are searched.
+    """
+
+    def __init__(self, reference, dist_comp, taux_acc, rebuild_ratio=2, signed=False):
+        """
+        `reference` is a `reference.Reference`, `dist_comp` the completeness threshold relative to its
+        diagonal and `taux_acc` the accuracy rate, `signed` selects the signed accuracy of
+        `middleburry.middlebury_accuracy`.
+        When the changes of a step have to be compared to more than `rebuild_ratio` times the number of
+        reference vertices, or when a quarter of them must be searched again because their closest vertex
+        moved, everything is recomputed instead.
+        """
+        if (taux_acc > 1 or taux_acc <= 0):
+            raise Exception("Taux invalide")
+        self.reference = reference
+        self.threshold = dist_comp * reference.diagonal
+        self.acc_index = math.ceil(len(reference.vertices) * taux_acc) - 1
+        self.rebuild_ratio = rebuild_ratio
+        self.signed = signed
+        self.distances = None
+        self.nearest = None
+        self.complete = np.zeros(0, dtype=bool)
+        self.vertex_count = 0
+        self.full_updates = 0
+        self.partial_updates = 0
+        self.build_grid()
+
+    def build_grid(self):
+        """
+        Sorts the reference vertices by cell of a regular grid: the vertices of the cell `i` are
+        `cell_points[cell_starts[i]:cell_starts[i] + cell_counts[i]]` and its box goes from `cell_min[i]` to
+        `cell_max[i]`, it is within `cell_radius` of `cell_center[i]`. `cell_bound[i]` is an upper bound of the distances of its vertices.
+        """
+        vertices = self.reference.vertices
+        origin = np.min(vertices, axis=0)
+        extent = np.max(np.max(vertices, axis=0) - origin)
+        # The vertices of a mesh lie on a surface, so the number of occupied cells grows like the square
+        divisions = max(1, int(math.sqrt(len(vertices) / CELL_SIZE)))
+        size = extent / divisions if extent > 0 else 1.0
+        coordinates = np.minimum(((vertices - origin) / size).astype(np.int64), divisions - 1)
+        keys = np.ravel_multi_index(coordinates.T, (divisions,) * 3)
+        self.cell_points = np.argsort(keys, kind="stable")
+        cells, self.cell_starts, self.point_cell, self.cell_counts = np.unique(
+            keys[self.cell_points], return_index=True, return_inverse=True, return_counts=True)
+        self.point_cell = self.point_cell[np.argsort(self.cell_points)]
+        self.cell_min = origin + np.stack(np.unravel_index(cells, (divisions,) * 3), axis=1) * size
+        self.cell_max = self.cell_min + size
+        self.cell_center = self.cell_min + size / 2
+        self.cell_radius = size * math.sqrt(3) / 2
+        self.cell_bound = np.full(len(cells), np.inf)
+
+    def update(self, vertices, changed_indices, faces):
+        """
+        Takes into account the vertices of the new snapshot, of which those at `changed_indices` were
+        inserted or moved since the previous call, and returns (hausdorff, accuracy, completeness).
+        `faces` are the visible faces of the snapshot.
+        The accuracy and the completeness are 0 when the snapshot has no face, like with `middlebury`.
+        """
+        if len(vertices) == 0:
+            raise ValueError("Cannot search nearest neighbours in an empty set of vertices")
+        changed_indices = np.asarray(changed_indices, dtype=np.int64)
+        with timing.stage('distances'):
+            if self.distances is None or not self.update_changed(vertices, changed_indices):
+                self.update_all(vertices)
+        self.vertex_count = len(vertices)
+
+        # `self.distances` already holds the exact distance of every reference vertex, as needed by the
+        # accuracy and the completeness: their maximum is the hausdorff distance, without the searches of
+        # `hausdorff.directed_hausdorff`, which would start again from scratch at every step
+        with timing.stage('hausdorff'):
+            haus = np.amax(self.distances)
+        if not len(faces):
+            return haus, 0, 0
+        with timing.stage('accuracy'):
+            if self.signed:
+                dist_acc = self.signed_accuracy(vertices, faces)
+            else:
+                dist_acc = np.partition(self.distances, self.acc_index)[self.acc_index]
+        with timing.stage('completeness'):
+            taux_comp = np.count_nonzero(self.complete[:len(vertices)]) / len(vertices)
+        return haus, dist_acc, taux_comp
+
+    def signed_accuracy(self, vertices, faces):
+        """
+        Returns the signed distance of the reference vertex that defines the accuracy, negative if it is
+        on the opposite side of the normal of its closest vertex.
+        """
+        ind = np.argpartition(self.distances, self.acc_index)[self.acc_index]
+        closest = self.nearest[ind]
+        # Only the faces around the closest vertex contribute to its normal
+        with timing.stage('normals'):
+            normal = normales_sommets(vertices, faces[np.any(faces == closest, axis=1)])[closest]
+        if np.dot(normal, self.reference.vertices[ind] - vertices[closest]) < 0.0:
+            return -self.distances[ind]
+        return self.distances[ind]
+
+    def update_all(self, vertices):
+        """
+        Recomputes every distance.
+        """
+        self.full_updates += 1
+        self.distances, self.nearest = nearest_distances(self.reference.vertices, vertices)
+        self.cell_bound = np.maximum.reduceat(self.distances[self.cell_points], self.cell_starts)
+        distances, _ = nearest_distances(vertices, index=self.reference.index)
+        self.complete = distances < self.threshold
+
+    def update_changed(self, vertices, changed_indices):
+        """
+        Updates the distances affected by the vertices at `changed_indices`.
+        Returns False, leaving the state to be recomputed, if the changes reach too much of the reference.
+        """
+        if not len(changed_indices):
+            self.partial_updates += 1
+            return True
+        reference_vertices = self.reference.vertices
+        changed_vertices = vertices[changed_indices]
+
+        # The reference vertices whose closest vertex moved may now be further: search them again
+        moved = changed_indices[changed_indices < self.vertex_count]
+        if len(moved):
+            invalid = np.flatnonzero(np.isin(self.nearest, moved))
+            if len(invalid) > len(reference_vertices) / 4:
+                return False
+            if len(invalid):
+                self.distances[invalid], self.nearest[invalid] = nearest_distances(reference_vertices[invalid],
+                                                                                   vertices)
+                np.maximum.at(self.cell_bound, self.point_cell[invalid], self.distances[invalid])
+
+        # The other ones can only get closer to a changed vertex, in the cells nearer than their bound
+        sources, cells = self.reachable_cells(changed_vertices)
+        if np.sum(self.cell_counts[cells]) > self.rebuild_ratio * len(reference_vertices):
+            return False
+        self.partial_updates += 1
+        if len(cells):
+            self.update_closer(vertices, changed_indices[sources], cells)
+
+        if len(self.complete) < len(vertices):
+            complete = np.zeros(max(len(vertices), 2 * len(self.complete)), dtype=bool)
+            complete[:len(self.complete)] = self.complete
+            self.complete = complete
+        distances, _ = nearest_distances(changed_vertices, index=self.reference.index)
+        self.complete[changed_indices] = distances < self.threshold
+        return True
+
+    def reachable_cells(self, points):
+        """
+        Returns the pairs (index in `points`, cell) such that the point is nearer to the box of the cell
+        than the distance bound of the cell.
+        """
+        # Candidate pairs from the spheres around the cells (a range search, so always on a KD-tree), then
+        # the exact distance to their boxes
+        neighbours = build_index(points, engine='kdtree').query_ball_point(self.cell_center,
+                                                                           self.cell_bound + self.cell_radius)
+        counts = np.fromiter(map(len, neighbours), dtype=np.int64, count=len(neighbours))
+        if not np.sum(counts):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        sources = np.concatenate([np.asarray(sources, dtype=np.int64) for sources in neighbours[counts > 0]])
+        cells = np.repeat(np.arange(len(counts)), counts)
+        block = points[sources]
+        gaps = np.maximum(np.maximum(self.cell_min[cells] - block, block - self.cell_max[cells]), 0)
+        reachable = np.sum(gaps ** 2, axis=1) < self.cell_bound[cells] ** 2
+        return sources[reachable], cells[reachable]
+
+    def cell_members(self, cells):
+        """
+        Returns the reference vertices of the given cells, concatenated, and the number of them per cell.
+        """
+        counts = self.cell_counts[cells]
+        offsets = np.repeat(self.cell_starts[cells] - np.cumsum(counts) + counts, counts)
+        return self.cell_points[offsets + np.arange(np.sum(counts))], counts
+
+    def update_closer(self, vertices, sources, cells):
+        """
+        Updates the reference vertices of `cells` that are closer to the changed vertex of the same rank in
+        `sources` than to their current closest vertex, then tightens the bounds of the updated cells.
+        """
+        reference_vertices = self.reference.vertices
+        candidates, counts = self.cell_members(cells)
+        sources = np.repeat(sources, counts)
+        distances = np.sqrt(np.sum((reference_vertices[candidates] - vertices[sources]) ** 2, axis=1))
+        closer = distances < self.distances[candidates]
+        if not np.any(closer):
+            return
+        candidates, sources, distances = candidates[closer], sources[closer], distances[closer]
+        # Keep the closest changed vertex of each reference vertex
+        order = np.lexsort((distances, candidates))
+        candidates, sources, distances = candidates[order], sources[order], distances[order]
+        first = np.flatnonzero(np.r_[True, candidates[1:] != candidates[:-1]])
+        self.distances[candidates[first]] = distances[first]
+        self.nearest[candidates[first]] = sources[first]
+
+        updated_cells = np.unique(self.point_cell[candidates[first]])
+        members, counts = self.cell_members(updated_cells)
+        self.cell_bound[updated_cells] = np.maximum.reduceat(self.distances[members], np.cumsum(counts) - counts)
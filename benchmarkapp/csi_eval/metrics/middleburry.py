@@ -0,0 +1,114 @@
+import math 
+import numpy as np
+from csi_eval import timing
+from csi_eval.metrics.nearest import nearest_distances
+
+### Middlebury
+def normales_sommets(model_vertices, model_faces):
+    """
+    Produit le tableau (N, 3) des normales associées à chaque point du model, en accumulant les
+    normales (non normalisées) des triangles adjacents avec une somme indexée (`np.bincount`) sur le
+    tableau aplati des faces. Les points qui n'appartiennent à aucun triangle ont une normale nulle.
+    """
+    vertices = np.asarray(model_vertices, dtype=np.float64).reshape(-1, 3)
+    faces = np.asarray(model_faces, dtype=np.int64).reshape(-1, 3)
+    v1 = vertices[faces[:, 0]]
+    v2 = vertices[faces[:, 1]]
+    v3 = vertices[faces[:, 2]]
+    normales_faces = np.cross(v1 - v2, v1 - v3)
+    # Chaque coin d'un triangle reçoit la normale du triangle
+    coins = faces.ravel()
+    poids = np.repeat(normales_faces, 3, axis=0)
+    normales = np.empty_like(vertices)
+    for axe in range(3):
+        normales[:, axe] = np.bincount(coins, weights=poids[:, axe], minlength=len(vertices))
+    normes = np.linalg.norm(normales, axis=1)
+    non_nulles = normes > 0
+    normales[non_nulles] /= normes[non_nulles, np.newaxis]
+    return normales
+
+def middlebury(modelr_vertices, modelr_faces, modelg_vertices, modelg_faces, taux_acc=0.9, dist_comp=1.5,
+               modelr_index=None, modelg_index=None, signed=False):
+    """
+    Calcul de l'accuracy et de la completness d'un modele reconstruit (R) par rapport à
+    un modèle de vérité terrain (G).
+    `modelg` et `modelr` sont des obja.Model et représentent respectivement le modèle de la vérité
+    terrain et le modèle à tester (dit modèle reconstruit)
+    Le `taux_acc` permet de definir quel pourcentage de distances doivent être gardées pour
+    évaluer le seuil qui permettent de les selectionner, qui est l'accuracy de R.
+    La `dist_comp` permet de definir la distance seuil à garder pour évaluer le taux de distances
+    placées à une distance inférieure à ce seuil, c'est le completeness de R.
+    `modelr_index` et `modelg_index` sont des index spatiaux déjà construits sur R et G, optionnels,
+    pour ne pas les reconstruire à chaque appel.
+    Avec `signed`, l'accuracy est une distance signée (voir `middlebury_accuracy`).
+    """
+    if len(modelg_faces):
+        # Les normales ne servent qu'à l'accuracy signée
+        with timing.stage('normals'):
+            ng = normales_sommets(modelg_vertices, modelg_faces) if signed else None
+
+        # Calcul de l'accuracy
+        with timing.stage('accuracy'):
+            dist_acc = middlebury_accuracy(modelg_vertices, modelr_vertices, ng, taux_acc,
+                                           modelg_index=modelg_index, signed=signed)
+
+        # Calcul de la completeness
+        with timing.stage('completeness'):
+            taux_comp = middlebury_completeness(modelg_vertices, modelr_vertices, dist_comp,
+                                                modelr_index=modelr_index)
+
+    else:
+        dist_acc = 0
+        taux_comp = 0
+
+    return (dist_acc, taux_comp)
+
+def middlebury_accuracy(modelg_vertices, modelr_vertices, ng, taux_acc=0.9, modelg_index=None, signed=False):
+    """
+    Pour calculer l'accuracy, on évalue la distance pour tous les vertex du modèle R
+    avec le point le plus proche de G associé.
+    `modelg` et `modelr` sont des obja.Model et représentent respectivement le modèle de la vérité
+    terrain et le modèle à tester (dit modèle reconstruit)
+    `ng` est le tableau des normales associées à chaque vertex du modèle G (`normales_sommets`),
+    utilisé seulement avec `signed`.
+    `modelg_index` est un index spatial déjà construit sur G (`nearest.build_index`), optionnel.
+    Sans `signed`, l'accuracy est la distance seuil qui garde `taux_acc` des distances.
+    Avec `signed`, la distance d'un vertex de R est négative s'il est du côté opposé à la normale
+    du point de G associé, et l'accuracy est la distance signée du vertex qui définit ce seuil.
+    """
+    if (taux_acc > 1 or taux_acc <= 0):
+        raise Exception("Taux invalide")
+    
+    verticesr = modelr_vertices
+    verticesg = modelg_vertices
+    distances, plus_proches = nearest_distances(verticesr, verticesg, index=modelg_index)
+
+    # Trouver la distance seuil qui garde `taux_acc` valeurs
+    index_dist = math.ceil(len(distances)*taux_acc)-1
+    if not signed:
+        distances_tri = sorted(list(map(abs, distances)))
+        return distances_tri[index_dist]
+
+    ind = np.argpartition(distances, index_dist)[index_dist]
+    vertexr = np.asarray(verticesr[ind], dtype=np.float64)
+    vertexg = np.asarray(verticesg[plus_proches[ind]], dtype=np.float64)
+    signe = np.dot(np.asarray(ng)[plus_proches[ind]], vertexr - vertexg)
+    dist_acc = -distances[ind] if signe < 0.0 else distances[ind]
+
+    return dist_acc
+
+def middlebury_completeness(modelg_vertices, modelr_vertices, dist_comp=1.5, modelr_index=None):
+    """
+    Pour calculer la complétude, on évalue la distance pour tous les vertex du modèle G
+    avec le point le plus proche de R associé et si cette distance est inférieur à une
+    distance dist_acc, on consière que le point de G est bien représenté par le modèle R, 
+    la complétude est la proportion de points de G bien représentés par R.
+    `modelr_index` est un index spatial déjà construit sur R (`nearest.build_index`), optionnel.
+    """
+    verticesr = modelr_vertices
+    verticesg = modelg_vertices
+    distances, _ = nearest_distances(verticesg, verticesr, index=modelr_index)
+
+    nb_valid = np.count_nonzero(distances < dist_comp)
+    taux_comp = nb_valid/len(verticesg)
+    return taux_comp
\ No newline at end of file
@@ -0,0 +1,48 @@
+import numpy as np
+from scipy.spatial import cKDTree
+from csi_eval.metrics.blocked import BlockedIndex
+
+# Engine of the nearest-neighbour searches ('kdtree' or 'blocked') and memory cap of the blocked one,
+# set from the configuration with `configure`
+ENGINE = 'kdtree'
+MEMORY_LIMIT_MB = 256
+
+
+def configure(engine='kdtree', memory_limit_mb=256):
+    """
+    Selects the engine of the indexes built by `build_index` without explicit engine.
+    """
+    global ENGINE, MEMORY_LIMIT_MB
+    if engine not in ('kdtree', 'blocked'):
+        raise ValueError("Unknown nearest-neighbour engine {}".format(engine))
+    ENGINE = engine
+    MEMORY_LIMIT_MB = memory_limit_mb
+
+
+def build_index(vertices, engine=None):
+    """
+    Builds the spatial index used to answer nearest-neighbour queries on `vertices`: a KD-tree, or with the
+    'blocked' engine a `blocked.BlockedIndex` that compares every pair of vertices by blocks of bounded
+    memory. Either way the memory of the index is linear in the model size.
+    """
+    vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+    if (engine or ENGINE) == 'blocked':
+        return BlockedIndex(vertices, MEMORY_LIMIT_MB)
+    return cKDTree(vertices)
+
+
+def nearest_distances(query_vertices, target_vertices=None, index=None):
+    """
+    Returns, for every vertex of `query_vertices`, the euclidean distance to the closest vertex of
+    `target_vertices`, together with the index of that closest vertex.
+    This is the same result as `np.amin(cdist(query, target), axis=1)` without allocating the dense
+    distance matrix. An index already built with `build_index(target_vertices)` can be passed to avoid
+    rebuilding it.
+    """
+    if index is None:
+        index = build_index(target_vertices)
+    query = np.asarray(query_vertices, dtype=np.float64).reshape(-1, 3)
+    if index.n == 0:
+        raise ValueError("Cannot search nearest neighbours in an empty set of vertices")
+    distances, indices = index.query(query)
+    return distances, indices
@@ -0,0 +1,95 @@
+"""
+Approximate metrics computed from random samples of the vertices, with bounds on their error.
+- The hausdorff distance is bounded for sure: the largest distance of the sampled reference vertices is a
+  lower bound, and since every reference vertex is within a known radius of a sampled one, adding that
+  radius gives an upper bound.
+- The accuracy (a quantile of the distances) comes with a distribution-free confidence interval made of
+  two order statistics of the sample.
+- The completeness (a proportion of the snapshot vertices) comes with a Clopper-Pearson interval.
+The distances themselves are exact: only the vertices whose distance is measured are sampled.
+"""
+
+import math
+import numpy as np
+from csi_eval.metrics.nearest import build_index, nearest_distances
+
+
+def quantile_interval(sorted_values, rate, confidence=0.95):
+    """
+    Returns a confidence interval (lower, upper) for the `rate` quantile of a population, from the sorted
+    values of a random sample of it: the number of sampled values below the quantile follows a binomial
+    law, whose tails give the ranks of the order statistics bounding the quantile.
+    """
+    # scipy.stats is slow to import and only needed by the previews
+    from scipy.stats import binom
+    n = len(sorted_values)
+    alpha = 1 - confidence
+    lower = int(binom.ppf(alpha / 2, n, rate)) - 1
+    upper = int(binom.ppf(1 - alpha / 2, n, rate))
+    return (sorted_values[max(lower, 0)], sorted_values[min(upper, n - 1)])
+
+
+def proportion_interval(successes, n, confidence=0.95):
+    """
+    Returns the Clopper-Pearson confidence interval (lower, upper) of a proportion observed as `successes`
+    out of `n` random draws.
+    """
+    from scipy.stats import beta
+    alpha = 1 - confidence
+    lower = beta.ppf(alpha / 2, successes, n - successes + 1) if successes > 0 else 0.0
+    upper = beta.ppf(1 - alpha / 2, successes + 1, n - successes) if successes < n else 1.0
+    return (float(lower), float(upper))
+
+
+class ReferenceSample:
+    """
+    A random sample of the vertices of a reference, with for each sampled vertex the radius of the set of
+    reference vertices it is the closest sampled vertex of.
+    """
+
+    def __init__(self, reference_vertices, count, seed=0):
+        """
+        Draws `count` vertices of `reference_vertices` (all of them if there are not more).
+        """
+        vertices = np.asarray(reference_vertices, dtype=np.float64).reshape(-1, 3)
+        rng = np.random.default_rng(seed)
+        self.indices = np.sort(rng.choice(len(vertices), size=min(count, len(vertices)), replace=False))
+        self.vertices = vertices[self.indices]
+        self.complete = len(self.indices) == len(vertices)
+        distances, closest = nearest_distances(vertices, self.vertices)
+        self.radius = np.zeros(len(self.indices))
+        np.maximum.at(self.radius, closest, distances)
+
+
+def preview_snapshot(sample, reference_index, vert_list, faces_list, dist_comp, taux_acc, count, rng,
+                     confidence=0.95):
+    """
+    Estimates the hausdorff distance, the middlebury accuracy and the middlebury completeness of a snapshot
+    from the reference vertices of `sample` (a `ReferenceSample`) and `count` snapshot vertices drawn with
+    `rng`. `reference_index` is the spatial index of the whole reference and `dist_comp` the absolute
+    completeness threshold.
+    Returns the estimates (hausdorff, accuracy, completeness) and their bounds
+    ((hausdorff lower, upper), (accuracy lower, upper), (completeness lower, upper)).
+    """
+    if (taux_acc > 1 or taux_acc <= 0):
+        raise Exception("Taux invalide")
+    snapshot_index = build_index(vert_list)
+    distances, _ = nearest_distances(sample.vertices, index=snapshot_index)
+    haus = np.amax(distances)
+    haus_bounds = (haus, haus) if sample.complete else (haus, np.amax(distances + sample.radius))
+    if not len(faces_list):
+        return (haus, 0, 0), (haus_bounds, (0, 0), (0, 0))
+
+    distances.sort()
+    dist_acc = distances[math.ceil(len(distances) * taux_acc) - 1]
+    acc_bounds = (dist_acc, dist_acc) if sample.complete else quantile_interval(distances, taux_acc, confidence)
+
+    vertices = np.asarray(vert_list, dtype=np.float64).reshape(-1, 3)
+    sampled = count < len(vertices)
+    if sampled:
+        vertices = vertices[rng.choice(len(vertices), size=count, replace=False)]
+    comp_distances, _ = nearest_distances(vertices, index=reference_index)
+    valid = np.count_nonzero(comp_distances < dist_comp)
+    taux_comp = valid / len(vertices)
+    comp_bounds = proportion_interval(valid, len(vertices), confidence) if sampled else (taux_comp, taux_comp)
+    return (haus, dist_acc, taux_comp), (haus_bounds, acc_bounds, comp_bounds)
@@ -0,0 +1,67 @@
+"""
+Metro-style distances between two surfaces, estimated from random points sampled on their triangles.
+The cost is set by the number of samples and not by the resolution of the meshes, and a model with few
+but well placed vertices is measured by the surface it covers rather than by its vertices.
+"""
+
+import numpy as np
+from csi_eval.metrics.surface import SurfaceIndex
+
+
+def triangle_areas(model_vertices, model_faces):
+    """
+    Returns the area of every triangle of a model.
+    """
+    vertices = np.asarray(model_vertices, dtype=np.float64).reshape(-1, 3)
+    faces = np.asarray(model_faces, dtype=np.int64).reshape(-1, 3)
+    a = vertices[faces[:, 0]]
+    return np.linalg.norm(np.cross(vertices[faces[:, 1]] - a, vertices[faces[:, 2]] - a), axis=1) / 2
+
+
+def sample_surface(model_vertices, model_faces, count, rng):
+    """
+    Draws `count` points uniformly on the surface of a model: the triangles are picked with a
+    probability proportional to their area, then a point is drawn uniformly in each of them with
+    barycentric coordinates. `rng` is a `numpy.random.Generator`.
+    """
+    vertices = np.asarray(model_vertices, dtype=np.float64).reshape(-1, 3)
+    faces = np.asarray(model_faces, dtype=np.int64).reshape(-1, 3)
+    areas = np.cumsum(triangle_areas(vertices, faces))
+    if len(faces) == 0 or areas[-1] <= 0:
+        raise ValueError("Cannot sample a surface without area")
+    triangles = np.minimum(np.searchsorted(areas, rng.random(count) * areas[-1], side="right"), len(faces) - 1)
+    u = rng.random(count)
+    v = rng.random(count)
+    # Fold the points of the parallelogram that are outside of the triangle back inside
+    outside = u + v > 1
+    u[outside] = 1 - u[outside]
+    v[outside] = 1 - v[outside]
+    a = vertices[faces[triangles, 0]]
+    return a + (vertices[faces[triangles, 1]] - a) * u[:, np.newaxis] + (vertices[faces[triangles, 2]] - a) * v[:, np.newaxis]
+
+
+def sampled_distances(model_vertices, model_faces, surface_index, count, rng):
+    """
+    Returns the distances from `count` points sampled on a model to the surface indexed by
+    `surface_index` (a `surface.SurfaceIndex`).
+    """
+    return surface_index.query(sample_surface(model_vertices, model_faces, count, rng))
+
+
+def metro(modelr_vertices, modelr_faces, modelg_vertices, modelg_faces, samples=10000, seed=0,
+          modelr_index=None, modelg_index=None):
+    """
+    Computes the symmetric hausdorff distance, the root mean square error and the mean error between
+    the surfaces of two models, from `samples` points drawn on each of them with the given `seed`.
+    The errors are those of the distances of the points of each surface to the other surface, the
+    two directions being pooled together.
+    `modelr_index` and `modelg_index` are `surface.SurfaceIndex` already built on the models, optional.
+    """
+    rng = np.random.default_rng(seed)
+    if modelr_index is None:
+        modelr_index = SurfaceIndex(modelr_vertices, modelr_faces)
+    if modelg_index is None:
+        modelg_index = SurfaceIndex(modelg_vertices, modelg_faces)
+    distances = np.concatenate((sampled_distances(modelr_vertices, modelr_faces, modelg_index, samples, rng),
+                                sampled_distances(modelg_vertices, modelg_faces, modelr_index, samples, rng)))
+    return np.amax(distances), np.sqrt(np.mean(distances ** 2)), np.mean(distances)
@@ -0,0 +1,227 @@
+"""
+Exact distance from points to the surface of a triangle mesh.
+The closest point of each triangle is computed for whole batches of (point, triangle) pairs at once,
+and a bounding volume hierarchy over the triangles avoids testing every triangle against every point.
+"""
+
+import numpy as np
+from csi_eval.metrics.nearest import build_index
+
+# Maximum number of triangles in a leaf of the hierarchy
+LEAF_SIZE = 8
+# Maximum number of (point, triangle) pairs processed at once
+BATCH_SIZE = 1 << 18
+
+
+def closest_points_triangles(points, a, b, c):
+    """
+    Returns the closest point to each of the (N, 3) `points` on the triangle of the same rank
+    (`a`, `b`, `c` are the (N, 3) corners of the triangles).
+    Follows the Voronoi regions of the triangle (vertices, edges, inside) as in Ericson, Real-Time
+    Collision Detection, 5.1.5. Degenerate triangles give a point of one of their edges.
+    """
+    ab = b - a
+    ac = c - a
+    ap = points - a
+    d1 = np.einsum("ij,ij->i", ab, ap)
+    d2 = np.einsum("ij,ij->i", ac, ap)
+    bp = points - b
+    d3 = np.einsum("ij,ij->i", ab, bp)
+    d4 = np.einsum("ij,ij->i", ac, bp)
+    cp = points - c
+    d5 = np.einsum("ij,ij->i", ab, cp)
+    d6 = np.einsum("ij,ij->i", ac, cp)
+
+    va = d3 * d6 - d5 * d4
+    vb = d5 * d2 - d1 * d6
+    vc = d1 * d4 - d3 * d2
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Inside the triangle
+        denominator = va + vb + vc
+        v = vb / denominator
+        w = vc / denominator
+        result = a + ab * v[:, np.newaxis] + ac * w[:, np.newaxis]
+
+        # Edge BC
+        edge = (va <= 0) & (d4 - d3 >= 0) & (d5 - d6 >= 0)
+        t = (d4 - d3) / ((d4 - d3) + (d5 - d6))
+        result = np.where(edge[:, np.newaxis], b + (c - b) * t[:, np.newaxis], result)
+        # Edge AC
+        edge = (vb <= 0) & (d2 >= 0) & (d6 <= 0)
+        t = d2 / (d2 - d6)
+        result = np.where(edge[:, np.newaxis], a + ac * t[:, np.newaxis], result)
+        # Edge AB
+        edge = (vc <= 0) & (d1 >= 0) & (d3 <= 0)
+        t = d1 / (d1 - d3)
+        result = np.where(edge[:, np.newaxis], a + ab * t[:, np.newaxis], result)
+
+    # Vertices
+    result = np.where(((d6 >= 0) & (d5 <= d6))[:, np.newaxis], c, result)
+    result = np.where(((d3 >= 0) & (d4 <= d3))[:, np.newaxis], b, result)
+    result = np.where(((d1 <= 0) & (d2 <= 0))[:, np.newaxis], a, result)
+
+    # Degenerate triangles fall in none of the regions: use the closest point of their edges
+    degenerate = ~np.all(np.isfinite(result), axis=1)
+    if np.any(degenerate):
+        result[degenerate] = closest_points_degenerate(points[degenerate], a[degenerate], b[degenerate],
+                                                       c[degenerate])
+    return result
+
+
+def closest_points_segments(points, a, b):
+    """
+    Returns the closest point to each of the (N, 3) `points` on the segment [`a`, `b`] of the same rank.
+    """
+    ab = b - a
+    length = np.einsum("ij,ij->i", ab, ab)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.einsum("ij,ij->i", points - a, ab) / length
+    t = np.clip(np.nan_to_num(t, nan=0.0), 0.0, 1.0)
+    return a + ab * t[:, np.newaxis]
+
+
+def closest_points_degenerate(points, a, b, c):
+    """
+    Returns the closest point to each of the `points` on the edges of flat triangles.
+    """
+    candidates = np.stack([closest_points_segments(points, a, b), closest_points_segments(points, b, c),
+                           closest_points_segments(points, c, a)])
+    distances = np.sum((candidates - points) ** 2, axis=2)
+    return candidates[np.argmin(distances, axis=0), np.arange(len(points))]
+
+
+def point_triangle_distances(points, a, b, c):
+    """
+    Returns the euclidean distance from each of the (N, 3) `points` to the triangle of the same rank.
+    """
+    return np.linalg.norm(points - closest_points_triangles(points, a, b, c), axis=1)
+
+
+class SurfaceIndex:
+    """
+    A bounding volume hierarchy over the triangles of a mesh, stored in flat arrays: node `i` has the box
+    `box_min[i]`, `box_max[i]` and either two children `left[i]`, `right[i]`, or (when `left[i]` is -1) the
+    triangles `order[start[i]:start[i] + count[i]]`.
+    """
+
+    def __init__(self, vertices, faces):
+        """
+        Builds the hierarchy by splitting the triangles at the median of their centroids along the longest
+        axis of their box, until `LEAF_SIZE` triangles remain.
+        """
+        self.vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+        self.faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+        if len(self.faces) == 0:
+            raise ValueError("Cannot compute distances to a surface without faces")
+        self.a = self.vertices[self.faces[:, 0]]
+        self.b = self.vertices[self.faces[:, 1]]
+        self.c = self.vertices[self.faces[:, 2]]
+        triangle_min = np.minimum(np.minimum(self.a, self.b), self.c)
+        triangle_max = np.maximum(np.maximum(self.a, self.b), self.c)
+        centroids = (self.a + self.b + self.c) / 3
+
+        # The nodes are built level by level, all the nodes of a level being split at once
+        self.order = np.arange(len(self.faces))
+        starts, counts = np.zeros(1, dtype=np.int64), np.array([len(self.faces)])
+        box_min, box_max, left, start, count = [], [], [], [], []
+        node_count = 1
+        while len(starts):
+            segments = np.repeat(np.arange(len(starts)), counts)
+            triangles = self.order[starts[0]:starts[-1] + counts[-1]]
+            box_min.append(np.minimum.reduceat(triangle_min[triangles], starts - starts[0]))
+            box_max.append(np.maximum.reduceat(triangle_max[triangles], starts - starts[0]))
+            start.append(starts)
+            count.append(counts)
+            split = counts > LEAF_SIZE
+            children = np.full(len(starts), -1, dtype=np.int64)
+            children[split] = node_count + 2 * np.arange(np.count_nonzero(split))
+            left.append(children)
+            node_count += 2 * np.count_nonzero(split)
+            if not np.any(split):
+                break
+
+            # Sort the triangles of each node along the longest axis of the box of their centroids
+            spread = (np.maximum.reduceat(centroids[triangles], starts - starts[0])
+                      - np.minimum.reduceat(centroids[triangles], starts - starts[0]))
+            axis = np.argmax(spread, axis=1)
+            keys = centroids[triangles, axis[segments]]
+            keys[~split[segments]] = 0
+            self.order[starts[0]:starts[-1] + counts[-1]] = triangles[np.lexsort((keys, segments))]
+            halves = counts[split] // 2
+            starts = np.stack((starts[split], starts[split] + halves), axis=1).reshape(-1)
+            counts = np.stack((halves, counts[split] - halves), axis=1).reshape(-1)
+
+        self.box_min = np.concatenate(box_min)
+        self.box_max = np.concatenate(box_max)
+        self.left = np.concatenate(left)
+        self.right = np.where(self.left < 0, -1, self.left + 1)
+        self.start = np.concatenate(start)
+        self.count = np.concatenate(count)
+        # The vertices of the surface give an upper bound of the distance to it
+        self.vertex_index = build_index(self.vertices[np.unique(self.faces)])
+
+    def box_distances(self, points, nodes):
+        """
+        Returns the distance from each point to the box of the node of the same rank.
+        """
+        gaps = np.maximum(np.maximum(self.box_min[nodes] - points, points - self.box_max[nodes]), 0)
+        return np.sqrt(np.sum(gaps ** 2, axis=1))
+
+    def query(self, points):
+        """
+        Returns the distance from each of the (N, 3) `points` to the surface.
+        The hierarchy is traversed breadth first for all the points at once, and a node is only opened
+        for the points whose best distance so far is larger than the distance to its box.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        best, _ = self.vertex_index.query(points)
+        queries = np.arange(len(points))
+        nodes = np.zeros(len(points), dtype=np.int64)
+        while len(queries):
+            near = self.box_distances(points[queries], nodes) < best[queries]
+            queries, nodes = queries[near], nodes[near]
+            leaf = self.left[nodes] < 0
+            # Leaves first, so that their triangles tighten the bounds used to prune the other nodes
+            self.query_leaves(points, best, queries[leaf], nodes[leaf])
+            queries, nodes = queries[~leaf], nodes[~leaf]
+            queries = np.concatenate((queries, queries))
+            nodes = np.concatenate((self.left[nodes], self.right[nodes]))
+        return best
+
+    def query_leaves(self, points, best, queries, nodes):
+        """
+        Updates `best` with the distances from the points at `queries` to the triangles of the leaves
+        `nodes`, by batches of at most `BATCH_SIZE` pairs.
+        """
+        counts = self.count[nodes]
+        for first in range(0, len(queries), max(1, BATCH_SIZE // LEAF_SIZE)):
+            batch = slice(first, first + max(1, BATCH_SIZE // LEAF_SIZE))
+            batch_counts = counts[batch]
+            total = np.sum(batch_counts)
+            offsets = np.repeat(self.start[nodes[batch]] - np.cumsum(batch_counts) + batch_counts, batch_counts)
+            triangles = self.order[offsets + np.arange(total)]
+            pair_queries = np.repeat(queries[batch], batch_counts)
+            distances = point_triangle_distances(points[pair_queries], self.a[triangles], self.b[triangles],
+                                                 self.c[triangles])
+            np.minimum.at(best, pair_queries, distances)
+
+
+def surface_distances(points, surface_vertices=None, surface_faces=None, index=None):
+    """
+    Returns, for every point of `points`, the euclidean distance to the closest point of the surface
+    made of `surface_vertices` and `surface_faces`. A `SurfaceIndex` already built on the surface can
+    be passed to avoid rebuilding it.
+    """
+    if index is None:
+        index = SurfaceIndex(surface_vertices, surface_faces)
+    return index.query(points)
+
+
+def surface_hausdorff(model_vertices, surface_vertices=None, surface_faces=None, index=None):
+    """
+    Computes the hausdorff distance from the vertices of a model to a surface: the largest distance from
+    one of the vertices to its closest point on the surface (and not only to the closest vertex, like
+    `hausdorff.hausdorff`).
+    """
+    return np.amax(surface_distances(model_vertices, surface_vertices, surface_faces, index=index))
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+
+"""
+obj model for python.
+"""
+
+import re
+import sys
+import numpy as np
+
+
+class VertexError(Exception):
+    """
+    An operation references a vertex that does not exist.
+    """
+
+    def __init__(self, index, line):
+        """
+        Creates the error from index of the referenced vertex and the line where the error occured.
+        """
+        self.line = line
+        self.index = index
+        super().__init__()
+
+    def __str__(self):
+        """
+        Pretty prints the error.
+        """
+        return f'There is no vector {self.index} (line {self.line})'
+
+
+class FaceError(Exception):
+    """
+    An operation references a face that does not exist.
+    """
+
+    def __init__(self, index, line):
+        """
+        Creates the error from index of the referenced face and the line where the error occured.
+        """
+        self.line = line
+        self.index = index
+        super().__init__()
+
+    def __str__(self):
+        """
+        Pretty prints the error.
+        """
+        return f'There is no face {self.index} (line {self.line})'
+
+
+class FaceVertexError(Exception):
+    """
+    An operation references a face vector that does not exist.
+    """
+
+    def __init__(self, index, line):
+        """
+        Creates the error from index of the referenced face vector and the line where the error occured.
+        """
+        self.line = line
+        self.index = index
+        super().__init__()
+
+    def __str__(self):
+        """
+        Pretty prints the error.
+        """
+        return f'Face has no vector {self.index} (line {self.line})'
+
+
+class UnknownInstruction(Exception):
+    """
+    An instruction is unknown.
+    """
+
+    def __init__(self, instruction, line):
+        """
+        Creates the error from instruction and the line where the error occured.
+        """
+        self.line = line
+        self.instruction = instruction
+        super().__init__()
+
+    def __str__(self):
+        """
+        Pretty prints the error.
+        """
+        return f'Instruction {self.instruction} unknown (line {self.line})'
+
+
+class Model:
+    """
+    The OBJ model, held as a (N, 3) float64 array of vertices and a (M, 3) int32 array of faces.
+    """
+
+    def __init__(self):
+        """
+        Intializes an empty model.
+        """
+        self.vertices = np.empty((0, 3), dtype=np.float64)
+        self.faces = np.empty((0, 3), dtype=np.int32)
+        self.line = 0
+
+    def get_vector_from_string(self, string):
+        """
+        Gets a vector from a string representing the index of the vector, starting at 1.
+        To get the vector from its index, simply use model.vertices[i].
+        """
+        index = int(string) - 1
+        if index >= len(self.vertices):
+            raise FaceError(index + 1, self.line)
+        return self.vertices[index]
+
+    def get_face_from_string(self, string):
+        """
+        Gets a face from a string representing the index of the face, starting at 1.
+        To get the face from its index, simply use model.faces[i].
+        """
+        index = int(string) - 1
+        if index >= len(self.faces):
+            raise FaceError(index + 1, self.line)
+        return self.faces[index]
+
+    def parse_file(self, path):
+        """
+        Parses an OBJ file.
+        """
+        self.vertices, self.faces, self.line = load_arrays(path)
+
+    def get_lists(self):
+        """
+        Returns the vertex and face arrays of the model.
+        """
+        return self.vertices, self.faces
+
+
+def load_arrays(path):
+    """
+    Reads an OBJ file straight into a contiguous (N, 3) float64 array of vertices and a (M, 3) int32
+    array of 0-based faces. Polygons are fan-triangulated and `ts` strips alternate their orientation.
+    Returns the vertices, the faces and the number of lines read.
+    Raises a VertexError if a face references a vertex that is not declared before it.
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    arrays = parse_buffer(data)
+    if arrays is None:
+        arrays = parse_lines(data.decode().splitlines())
+    vertices, faces, face_lines, line = arrays
+
+    # Every face must reference vertices declared before it
+    if len(faces):
+        declared = np.repeat(face_lines[:, 1], face_lines[:, 2])
+        invalid = np.nonzero(faces >= declared[:, np.newaxis])
+        if len(invalid[0]):
+            face = invalid[0][0]
+            face_line = face_lines[np.searchsorted(np.cumsum(face_lines[:, 2]), face, side='right'), 0]
+            raise VertexError(int(faces[face, invalid[1][0]]) + 1, int(face_line))
+
+    return vertices, faces.astype(np.int32), line
+
+
+def parse_buffer(data):
+    """
+    Parses the content of an OBJ file without a Python loop over its lines: the `v` and `f` lines are
+    gathered as byte blocks and converted by numpy in one call each.
+    Returns the vertices, the faces, the (line, declared vertices, triangles) of every face line and the
+    number of lines, or None if the file uses something this path does not handle (`ts` strips,
+    indented lines, vertices without exactly 3 coordinates), in which case `parse_lines` is used.
+    """
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    if len(buffer) == 0:
+        return None
+    ends = np.flatnonzero(buffer == ord("\n")) + 1
+    if len(ends) == 0 or ends[-1] != len(buffer):
+        ends = np.append(ends, len(buffer))
+    starts = np.concatenate(([0], ends[:-1]))
+    lengths = ends - starts
+    first = buffer[starts]
+    second = buffer[np.minimum(starts + 1, len(buffer) - 1)]
+    separated = (second == ord(" ")) | (second == ord("\t"))
+    if np.any((first == ord(" ")) | (first == ord("\t"))) or np.any((first == ord("t")) & (second == ord("s"))):
+        return None
+    vertex_lines = (first == ord("v")) & separated
+    face_lines = (first == ord("f")) & separated
+
+    block = gather_lines(buffer, starts, lengths, vertex_lines)
+    if np.any(tokens_per_line(block, lengths[vertex_lines]) != 3):
+        return None
+    vertices = np.fromstring(block, dtype=np.float64, sep=" ").reshape(-1, 3)
+
+    block = gather_lines(buffer, starts, lengths, face_lines)
+    counts = tokens_per_line(block, lengths[face_lines])
+    if b"/" in block:
+        block = re.sub(rb"/\S*", b"", block)
+    faces = fan_triangulate(np.fromstring(block, dtype=np.int64, sep=" "), counts) - 1
+
+    line_numbers = np.flatnonzero(face_lines)
+    declared = np.cumsum(vertex_lines)[line_numbers]
+    return vertices, faces, np.stack((line_numbers + 1, declared, np.maximum(counts - 2, 0)), axis=1), len(starts)
+
+
+def gather_lines(buffer, starts, lengths, selected):
+    """
+    Concatenates the `selected` lines of a byte buffer, replacing their leading instruction by a blank.
+    """
+    block = buffer[np.repeat(selected, lengths)]
+    selected_lengths = lengths[selected]
+    block[np.cumsum(selected_lengths) - selected_lengths] = ord(" ")
+    return block.tobytes()
+
+
+def tokens_per_line(block, lengths):
+    """
+    Counts the blank-separated tokens of each line of a block built by `gather_lines`.
+    """
+    filled = np.frombuffer(block, dtype=np.uint8) > ord(" ")
+    token_starts = np.flatnonzero(filled[1:] & ~filled[:-1]) + 1
+    if len(filled) and filled[0]:
+        token_starts = np.concatenate(([0], token_starts))
+    bounds = np.concatenate(([0], np.cumsum(lengths)))
+    return np.diff(np.searchsorted(token_starts, bounds))
+
+
+def fan_triangulate(indices, counts):
+    """
+    Triangulates polygons given as a flat array of vertex indices and the number of indices of each
+    polygon: a polygon (a, b, c, d, ...) gives the triangles (a, b, c), (a, c, d), ...
+    """
+    if np.all(counts == 3):
+        return indices.reshape(-1, 3)
+    triangles = np.maximum(counts - 2, 0)
+    polygon = np.repeat(np.arange(len(counts)), triangles)
+    first = (np.cumsum(counts) - counts)[polygon]
+    rank = np.arange(len(polygon)) - np.repeat(np.cumsum(triangles) - triangles, triangles)
+    return np.stack((indices[first], indices[first + rank + 1], indices[first + rank + 2]), axis=1)
+
+
+def parse_lines(lines):
+    """
+    Parses the lines of an OBJ file one by one, for the files `parse_buffer` does not handle.
+    Returns the same arrays as `parse_buffer`.
+    """
+    coordinates = []
+    indices = []
+    counts = []
+    # For every face line: its number, the number of vertices declared so far and of triangles produced
+    face_lines = []
+    for line, text in enumerate(lines, 1):
+        split = text.split()
+        if len(split) == 0:
+            continue
+
+        if split[0] == "v":
+            coordinates.extend(split[1:4])
+
+        elif split[0] == "f":
+            indices.extend(index.split('/')[0] for index in split[1:])
+            counts.append(len(split) - 1)
+            face_lines.append((line, len(coordinates) // 3, max(len(split) - 3, 0)))
+
+        elif split[0] == "ts":
+            for i in range(1, len(split) - 2):
+                if i % 2 == 1:
+                    indices.extend(index.split('/')[0] for index in (split[i], split[i + 1], split[i + 2]))
+                else:
+                    indices.extend(index.split('/')[0] for index in (split[i], split[i + 2], split[i + 1]))
+                counts.append(3)
+            face_lines.append((line, len(coordinates) // 3, max(len(split) - 3, 0)))
+
+    vertices = np.array(coordinates, dtype=np.float64).reshape(-1, 3)
+    faces = fan_triangulate(np.array(indices, dtype=np.int64), np.array(counts, dtype=np.int64)) - 1
+    return vertices, faces, np.array(face_lines, dtype=np.int64).reshape(-1, 3), len(lines)
+
+
+def parse_file(path):
+    """
+    Parses a file and returns the model.
+    """
+    model = Model()
+    model.parse_file(path)
+    return model
+
+
+def main():
+    if len(sys.argv) == 1:
+        print("obj needs a path to an obj file")
+        return
+
+    model = parse_file(sys.argv[1])
+    print(model.vertices)
+    print(model.faces)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,490 @@
+#!/usr/bin/env python3
+
+"""
+obja model for python.
+"""
+
+import sys
+import numpy as np
+from csi_eval import timing
+
+SIZES = {"v": 13, "f": 4, "ev": 14, "tv": 14, "ef": 5, "efv": 4, "df": 1, "ts": 6, "tf": 7, "s": 0, "#": 0, "fc": 0}
+
+
+class VertexError(Exception):
+    """
+    An operation references a vertex that does not exist.
+    """
+
+    def __init__(self, index, line):
+        """
+        Creates the error from index of the referenced vertex and the line where the error occured.
+        """
+        self.line = line
+        self.index = index
+        super().__init__()
+
+    def __str__(self):
+        """
+        Pretty prints the error.
+        """
+        return f'There is no vector {self.index} (line {self.line})'
+
+
+class FaceError(Exception):
+    """
+    An operation references a face that does not exist.
+    """
+
+    def __init__(self, index, line):
+        """
+        Creates the error from index of the referenced face and the line where the error occured.
+        """
+        self.line = line
+        self.index = index
+        super().__init__()
+
+    def __str__(self):
+        """
+        Pretty prints the error.
+        """
+        return f'There is no face {self.index} (line {self.line})'
+
+
+class FaceVertexError(Exception):
+    """
+    An operation references a face vector that does not exist.
+    """
+
+    def __init__(self, index, line):
+        """
+        Creates the error from index of the referenced face vector and the line where the error occured.
+        """
+        self.line = line
+        self.index = index
+        super().__init__()
+
+    def __str__(self):
+        """
+        Pretty prints the error.
+        """
+        return f'Face has no vector {self.index} (line {self.line})'
+
+
+class UnknownInstruction(Exception):
+    """
+    An instruction is unknown.
+    """
+
+    def __init__(self, instruction, line):
+        """
+        Creates the error from instruction and the line where the error occured.
+        """
+        self.line = line
+        self.instruction = instruction
+        super().__init__()
+
+    def __str__(self):
+        """
+        Pretty prints the error.
+        """
+        return f'Instruction {self.instruction} unknown (line {self.line})'
+
+
+class Snapshot:
+    """
+    The changes of the mesh between two consecutive snapshots of an OBJA stream.
+    Only the vertices and faces created or modified since the previous snapshot are stored, so that
+    keeping every snapshot of a stream costs as much as the stream itself.
+    """
+
+    def __init__(self, vertex_count, face_count, vertex_indices, vertex_values, face_indices, face_values,
+                 face_visible, temporary=False):
+        """
+        Initializes a snapshot from the sizes of the mesh and the changed rows.
+        """
+        self.vertex_count = vertex_count
+        self.face_count = face_count
+        self.vertex_indices = vertex_indices
+        self.vertex_values = vertex_values
+        self.face_indices = face_indices
+        self.face_values = face_values
+        self.face_visible = face_visible
+        self.temporary = temporary
+
+    def nbytes(self):
+        """
+        Returns the memory used by the arrays of the snapshot.
+        """
+        return (self.vertex_indices.nbytes + self.vertex_values.nbytes + self.face_indices.nbytes +
+                self.face_values.nbytes + self.face_visible.nbytes)
+
+    def __repr__(self):
+        return "<Snapshot {} vertices, {} faces, {} changed>".format(
+            self.vertex_count, self.face_count, len(self.vertex_indices) + len(self.face_indices))
+
+
+class Mesh:
+    """
+    A mesh held in growable numpy arrays: (N, 3) float64 vertices, (M, 3) int32 faces and a visibility
+    mask of the faces, so that deleted faces keep their index.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty mesh.
+        """
+        self.vertex_buffer = np.empty((64, 3), dtype=np.float64)
+        self.face_buffer = np.empty((64, 3), dtype=np.int32)
+        self.visible_buffer = np.empty(64, dtype=bool)
+        self.vertex_count = 0
+        self.face_count = 0
+
+    def reserve(self, vertex_count, face_count):
+        """
+        Grows the buffers, doubling their capacity, so that they can hold the given number of rows.
+        """
+        if vertex_count > len(self.vertex_buffer):
+            capacity = max(vertex_count, 2 * len(self.vertex_buffer))
+            buffer = np.empty((capacity, 3), dtype=np.float64)
+            buffer[:self.vertex_count] = self.vertex_buffer[:self.vertex_count]
+            self.vertex_buffer = buffer
+        if face_count > len(self.face_buffer):
+            capacity = max(face_count, 2 * len(self.face_buffer))
+            buffer = np.empty((capacity, 3), dtype=np.int32)
+            buffer[:self.face_count] = self.face_buffer[:self.face_count]
+            self.face_buffer = buffer
+            visible = np.empty(capacity, dtype=bool)
+            visible[:self.face_count] = self.visible_buffer[:self.face_count]
+            self.visible_buffer = visible
+
+    def apply(self, snapshot):
+        """
+        Applies the changes stored in a snapshot.
+        """
+        self.reserve(snapshot.vertex_count, snapshot.face_count)
+        self.vertex_count = snapshot.vertex_count
+        self.face_count = snapshot.face_count
+        self.vertex_buffer[snapshot.vertex_indices] = snapshot.vertex_values
+        self.face_buffer[snapshot.face_indices] = snapshot.face_values
+        self.visible_buffer[snapshot.face_indices] = snapshot.face_visible
+
+    def get_arrays(self):
+        """
+        Returns the vertices and the visible faces of the mesh.
+        The vertices are a view on the buffer: they are only valid until the mesh is modified again.
+        """
+        faces = self.face_buffer[:self.face_count]
+        return self.vertex_buffer[:self.vertex_count], faces[self.visible_buffer[:self.face_count]]
+
+
+class Model:
+    """
+    The OBJA model.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty model.
+        """
+        self.mesh = Mesh()
+        self.line = 0
+        self.steps = []
+        self.steps_temp = []
+        self.snapshots = []
+        self.faces_color = []
+        self.size = 0
+        self.declared_size = 0
+        self.file_len = 0
+        self.declared_steps = False
+        self.step_count = 0
+        self.last_step = None
+        # Rows created or modified since the last snapshot
+        self.last_vertex_count = 0
+        self.last_face_count = 0
+        self.changed_vertices = set()
+        self.changed_faces = set()
+        # Rows created or modified since the previous step yielded by `iter_parse`
+        self.step_changes = None
+
+    @property
+    def vertices(self):
+        return self.mesh.vertex_buffer[:self.mesh.vertex_count]
+
+    @property
+    def faces(self):
+        return self.mesh.face_buffer[:self.mesh.face_count]
+
+    @property
+    def visible(self):
+        return self.mesh.visible_buffer[:self.mesh.face_count]
+
+    def get_vector_index(self, string):
+        """
+        Gets the index of a vector from a string representing the index of the vector, starting at 1.
+        """
+        index = int(string) - 1
+        if index >= self.mesh.vertex_count:
+            raise FaceError(index + 1, self.line)
+        return index
+
+    def get_face_index(self, string):
+        """
+        Gets the index of a face from a string representing the index of the face, starting at 1.
+        """
+        index = int(string) - 1
+        if index >= self.mesh.face_count:
+            raise FaceError(index + 1, self.line)
+        return index
+
+    def get_vector_from_string(self, string):
+        """
+        Gets a vector from a string representing the index of the vector, starting at 1.
+        To get the vector from its index, simply use model.vertices[i].
+        """
+        return self.vertices[self.get_vector_index(string)]
+
+    def get_face_from_string(self, string):
+        """
+        Gets a face from a string representing the index of the face, starting at 1.
+        To get the face from its index, simply use model.faces[i].
+        """
+        return self.faces[self.get_face_index(string)]
+
+    def scan_file(self, path):
+        """
+        Reads an OBJA file once without parsing it, to know its length and its steps beforehand: the `s`
+        markers if there are some, else the lines where a snapshot is taken every tenth of the file.
+        Sets `file_len`, `declared_steps`, `step_count` and `last_step`, the value steps are normalized by.
+        """
+        markers = []
+        self.file_len = 0
+        with open(path, "r") as file:
+            for line in file:
+                self.file_len += 1
+                split = line.split(None, 2)
+                if split and split[0] == "s":
+                    markers.append(int(split[1]))
+        self.declared_steps = bool(markers)
+        if markers:
+            self.step_count = len(markers)
+            self.last_step = markers[-1]
+            return
+
+        # Without markers, a snapshot is taken on the multiples of a tenth of the file that are instructions
+        period = max(self.file_len // 10, 1)
+        self.step_count = 0
+        self.last_step = None
+        with open(path, "r") as file:
+            for number, line in enumerate(file, 1):
+                if number % period:
+                    continue
+                split = line.split(None, 1)
+                if split and split[0] in SIZES and split[0] not in ("fc", "#"):
+                    self.step_count += 1
+                    self.last_step = number
+
+    def parse_file(self, path):
+        """
+        Parses an OBJA file, recording every snapshot.
+        """
+        self.scan_file(path)
+        with open(path, "r") as file:
+            for line in file:
+                temporary = self.parse_line(line)
+                if temporary is not None:
+                    self.snapshots.append(self.take_snapshot(temporary))
+        if self.steps:
+            self.steps = [s / self.steps[-1] for s in self.steps]
+        else:
+            self.steps = [s / self.steps_temp[-1] for s in self.steps_temp]
+
+    def iter_parse(self, path):
+        """
+        Parses an OBJA file lazily and yields, as soon as each step is reached, the normalized step, the
+        vertices and the visible faces of the mesh, so that the whole file and its snapshots are
+        never held in memory.
+        The vertices are a view that is only valid until the next step is parsed: copy them to keep them.
+        The indices of the vertices and faces created or modified since the previous step are then
+        available in `step_changes`.
+        """
+        self.scan_file(path)
+        temporary_steps = not self.declared_steps
+        with open(path, "r") as file:
+            for line in file:
+                temporary = self.parse_line(line)
+                if temporary is None or temporary != temporary_steps:
+                    continue
+                with timing.stage('snapshot'):
+                    self.step_changes = self.take_changes()
+                    vertices, faces = self.mesh.get_arrays()
+                if temporary:
+                    step = self.steps_temp[-1] / self.last_step
+                else:
+                    step = self.steps[-1] / self.last_step
+                yield step, vertices, faces
+
+    def add_vertex(self, array):
+        """
+        Adds a vertex from an array of strings representing floats.
+        """
+        self.mesh.reserve(self.mesh.vertex_count + 1, 0)
+        self.mesh.vertex_buffer[self.mesh.vertex_count] = (float(array[0]), float(array[1]), float(array[2]))
+        self.mesh.vertex_count += 1
+
+    def add_face(self, array):
+        """
+        Adds a face from an array of strings representing vector indices (starting at 1).
+        """
+        face = [int(index.split('/')[0]) - 1 for index in array[:3]]
+        for index in face:
+            if index >= self.mesh.vertex_count:
+                raise VertexError(index + 1, self.line)
+        self.mesh.reserve(0, self.mesh.face_count + 1)
+        self.mesh.face_buffer[self.mesh.face_count] = face
+        self.mesh.visible_buffer[self.mesh.face_count] = True
+        self.mesh.face_count += 1
+
+    def parse_line(self, line):
+        """
+        Parses a line of obja file.
+        Returns None, or whether the snapshot the line ends is temporary (taken every tenth of a file
+        without `s` markers) if it ends one.
+        """
+        self.line += 1
+
+        split = line.split()
+
+        if len(split) == 0:
+            return
+
+        self.size += SIZES[split[0]]
+
+        if split[0] == "v":
+            self.add_vertex(split[1:])
+
+        elif split[0] == "ev":
+            index = self.get_vector_index(split[1])
+            self.mesh.vertex_buffer[index] = (float(split[2]), float(split[3]), float(split[4]))
+            self.changed_vertices.add(index)
+
+        elif split[0] == "tv":
+            index = self.get_vector_index(split[1])
+            self.mesh.vertex_buffer[index] += (float(split[2]), float(split[3]), float(split[4]))
+            self.changed_vertices.add(index)
+
+        elif split[0] == "f" or split[0] == "tf":
+            for i in range(1, len(split) - 2):
+                self.add_face(split[i:i + 3])
+
+        elif split[0] == "ts":
+            for i in range(1, len(split) - 2):
+                if i % 2 == 1:
+                    self.add_face([split[i], split[i + 1], split[i + 2]])
+                else:
+                    self.add_face([split[i], split[i + 2], split[i + 1]])
+
+        elif split[0] == "ef":
+            index = self.get_face_index(split[1])
+            self.mesh.face_buffer[index] = [int(vertex.split('/')[0]) - 1 for vertex in split[2:5]]
+            self.changed_faces.add(index)
+
+        elif split[0] == "efv":
+            index = self.get_face_index(split[1])
+            vector = int(split[2])
+            if vector < 1 or vector > 3:
+                raise FaceVertexError(vector, self.line)
+            self.mesh.face_buffer[index, vector - 1] = int(split[3]) - 1
+            self.changed_faces.add(index)
+
+        elif split[0] == "df":
+            index = self.get_face_index(split[1])
+            self.mesh.visible_buffer[index] = False
+            self.changed_faces.add(index)
+
+        elif split[0] == "s":
+            self.steps.append(int(split[1]))
+            self.declared_size = int(split[1])
+            return False
+
+        elif split[0] == "fc":
+            # self.faces_color[int(split[1])] = [float(split[2]),float(split[3]),float(split[4])]
+            return
+
+        elif split[0] == "#":
+            return
+
+        else:
+            return
+            # raise UnknownInstruction(split[0], self.line)
+        if not self.line % max(self.file_len // 10, 1) and not self.steps:
+            self.steps_temp.append(self.line)
+            return True
+
+    def take_changes(self):
+        """
+        Returns the indices of the vertices and of the faces created or modified since the previous call.
+        """
+        mesh = self.mesh
+        vertex_indices = np.array(sorted(i for i in self.changed_vertices if i < self.last_vertex_count),
+                                  dtype=np.int64)
+        vertex_indices = np.concatenate((vertex_indices, np.arange(self.last_vertex_count, mesh.vertex_count)))
+        face_indices = np.array(sorted(i for i in self.changed_faces if i < self.last_face_count), dtype=np.int64)
+        face_indices = np.concatenate((face_indices, np.arange(self.last_face_count, mesh.face_count)))
+        self.last_vertex_count = mesh.vertex_count
+        self.last_face_count = mesh.face_count
+        self.changed_vertices = set()
+        self.changed_faces = set()
+        return vertex_indices, face_indices
+
+    def take_snapshot(self, temporary=False):
+        """
+        Records the vertices and faces created or modified since the previous snapshot.
+        """
+        mesh = self.mesh
+        vertex_indices, face_indices = self.take_changes()
+        return Snapshot(mesh.vertex_count, mesh.face_count, vertex_indices, mesh.vertex_buffer[vertex_indices],
+                        face_indices, mesh.face_buffer[face_indices], mesh.visible_buffer[face_indices], temporary)
+
+    def iter_snapshots(self):
+        """
+        Replays the recorded snapshots and yields, for each step, the vertices and the visible faces of
+        the mesh (faces deleted with `df` are left out).
+        The vertices are a view that is only valid until the next snapshot is produced: copy them to
+        keep them.
+        """
+        temporary = not any(not snapshot.temporary for snapshot in self.snapshots)
+        mesh = Mesh()
+        for snapshot in self.snapshots:
+            mesh.apply(snapshot)
+            if snapshot.temporary == temporary:
+                yield mesh.get_arrays()
+
+    def get_lists(self):
+        """
+        Returns the current vertices and visible faces of the model.
+        """
+        return self.mesh.get_arrays()
+
+
+def parse_file(path):
+    """
+    Parses a file and returns the model.
+    """
+    model = Model()
+    model.parse_file(path)
+    return model
+
+
+def main():
+    if len(sys.argv) == 1:
+        print("obja needs a path to an obja file")
+        return
+
+    model = parse_file(sys.argv[1])
+    print(model.vertices)
+    print(model.faces)
+
+
+if __name__ == "__main__":
+    main()
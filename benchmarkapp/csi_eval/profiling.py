@@ -0,0 +1,97 @@
+"""
+Profiling of an evaluation, for the uploads that are unexpectedly slow: `cProfile` gives the functions
+the time goes to, `tracemalloc` the lines that allocate the most memory (numpy reports its arrays to it).
+Both slow the evaluation down noticeably, so that they are only run on demand.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import tracemalloc
+from contextlib import contextmanager
+
+# The files written by `Profile.save`
+ARTIFACTS = ('profile.txt', 'allocations.txt', 'profile.pstats')
+
+
+class Profile:
+    """
+    The results of a profiled block: the `cProfile.Profile`, the `tracemalloc` snapshot taken when the
+    traced memory was the highest among the `checkpoint` calls and the end of the block, and the peak of
+    the memory traced during it, in bytes.
+    """
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+        self.snapshot = None
+        self.snapshot_size = 0
+        self.peak = None
+
+    def checkpoint(self):
+        """
+        Takes a new snapshot if the traced memory grew by more than 10% since the kept one, e.g. between
+        two steps of an evaluation, so that the allocations are reported when the most memory is held.
+        """
+        current = tracemalloc.get_traced_memory()[0]
+        if current > 1.1 * self.snapshot_size:
+            self.snapshot = tracemalloc.take_snapshot()
+            self.snapshot_size = current
+
+    def stats_text(self, limit=50):
+        """
+        Returns the `limit` functions with the highest cumulative time, then with the highest own time.
+        """
+        output = io.StringIO()
+        stats = pstats.Stats(self.profiler, stream=output)
+        stats.sort_stats('cumulative').print_stats(limit)
+        stats.sort_stats('tottime').print_stats(limit)
+        return output.getvalue()
+
+    def allocations_text(self, limit=25):
+        """
+        Returns the `limit` lines with the largest allocations in the kept snapshot.
+        """
+        lines = ['Peak traced memory: {:.1f} MiB, {:.1f} MiB in the snapshot below'.format(
+            self.peak / 2 ** 20, self.snapshot_size / 2 ** 20), '']
+        statistics = self.snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)]).statistics(
+            'lineno')
+        for statistic in statistics[:limit]:
+            frame = statistic.traceback[0]
+            lines.append('{:10.1f} KiB {:8d} blocks  {}:{}'.format(statistic.size / 1024, statistic.count,
+                                                                   frame.filename, frame.lineno))
+        return '\n'.join(lines) + '\n'
+
+    def save(self, directory, limit=25):
+        """
+        Writes the `ARTIFACTS` of the profile in `directory`: the statistics as text and in the `pstats`
+        format (for `python -m pstats` or snakeviz), and the top allocation sites.
+        """
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, 'profile.txt'), 'w') as file:
+            file.write(self.stats_text(2 * limit))
+        with open(os.path.join(directory, 'allocations.txt'), 'w') as file:
+            file.write(self.allocations_text(limit))
+        self.profiler.dump_stats(os.path.join(directory, 'profile.pstats'))
+
+
+@contextmanager
+def profile():
+    """
+    Profiles the block with `cProfile` and `tracemalloc`, and gives its `Profile`, complete at the end of
+    the block.
+    """
+    result = Profile()
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    result.profiler.enable()
+    try:
+        yield result
+    finally:
+        result.profiler.disable()
+        result.peak = tracemalloc.get_traced_memory()[1]
+        result.checkpoint()
+        if not tracing:
+            tracemalloc.stop()
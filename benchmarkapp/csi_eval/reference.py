@@ -0,0 +1,259 @@
+"""
+Precomputed data of the reference models, shared by every evaluation of the process.
+The arrays are published on disk as `.npy` files and memory-mapped read-only, so that every process
+of the host shares the same physical pages instead of holding its own copy.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import numpy as np
+from csi_eval.obj import load_arrays
+from csi_eval.metrics.middleburry import normales_sommets
+from csi_eval.metrics.nearest import build_index
+from csi_eval.metrics.preview import ReferenceSample
+from csi_eval.metrics.surface import SurfaceIndex
+
+ARRAYS = ("vertices", "faces", "normals", "diagonal")
+
+logger = logging.getLogger(__name__)
+
+
+def file_hash(path):
+    """
+    Computes the sha1 of a file, read by chunks.
+    """
+    sha1 = hashlib.sha1()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            sha1.update(chunk)
+    return sha1.hexdigest()
+
+
+def bbox_diagonal(vertices):
+    """
+    Computes the length of the diagonal of the bounding box of an (N, 3) array of vertices.
+    """
+    mins = np.min(vertices, axis=0)
+    maxs = np.max(vertices, axis=0)
+    return np.sqrt(np.power(maxs[0] - mins[0], 2) + np.power(maxs[1] - mins[1], 2) + np.power(maxs[2] - mins[2], 2))
+
+
+def read_only(array):
+    """
+    Returns a read-only view of an array, so that shared reference data cannot be modified by mistake.
+    """
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+class Reference:
+    """
+    The class that holds a reference model and everything derived from it that the metrics need.
+    Instances are read-only once built and can be shared between requests.
+    """
+
+    def __init__(self, name, path, digest, vertices, faces, diagonal, normals, directory=None):
+        """
+        Initializes a reference from its arrays. The spatial index is built right away.
+        `directory` is where the arrays are published, if they are memory maps of published files.
+        """
+        self.name = name
+        self.directory = directory
+        self.path = path
+        self.digest = digest
+        self.vertices = read_only(vertices)
+        self.faces = read_only(faces)
+        self.diagonal = float(diagonal)
+        self.normals = read_only(normals)
+        self.index = build_index(self.vertices)
+        self._surface_index = None
+        self._samples = {}
+
+    @property
+    def surface_index(self):
+        """
+        The hierarchy of the triangles of the reference (`surface.SurfaceIndex`), built on first use since
+        only the surface metrics need it.
+        """
+        if self._surface_index is None:
+            self._surface_index = SurfaceIndex(self.vertices, self.faces)
+        return self._surface_index
+
+    def sample(self, count, seed=0):
+        """
+        Returns the `preview.ReferenceSample` of `count` vertices drawn with `seed`, built on first use.
+        """
+        key = (count, seed)
+        if key not in self._samples:
+            self._samples[key] = ReferenceSample(self.vertices, count, seed)
+        return self._samples[key]
+
+    @staticmethod
+    def from_obj(name, path, digest):
+        """
+        Builds a reference by parsing its OBJ file.
+        """
+        vertices, faces, _ = load_arrays(path)
+        return Reference(name, path, digest, vertices, faces, bbox_diagonal(vertices),
+                         normales_sommets(vertices, faces))
+
+    def save(self, directory):
+        """
+        Publishes the arrays of the reference as `.npy` files in `directory`. The files are written in
+        a temporary directory renamed at the end, so that concurrent processes never see partial files.
+        """
+        tmp_directory = "{}.{}.tmp".format(directory, os.getpid())
+        os.makedirs(tmp_directory, exist_ok=True)
+        for array in ARRAYS:
+            np.save(os.path.join(tmp_directory, array + ".npy"), np.asarray(getattr(self, array)))
+        try:
+            os.rename(tmp_directory, directory)
+        except OSError:
+            # Another process published the same reference in the meantime
+            shutil.rmtree(tmp_directory, ignore_errors=True)
+
+    @staticmethod
+    def load(name, path, digest, directory):
+        """
+        Attaches to a reference published with `save`: the arrays are read-only memory maps of the files.
+        """
+        arrays = {array: np.load(os.path.join(directory, array + ".npy"), mmap_mode="r") for array in ARRAYS}
+        return Reference(name, path, digest, arrays["vertices"], arrays["faces"], arrays["diagonal"],
+                         arrays["normals"], directory)
+
+    def __repr__(self):
+        return "<Reference {} {}>".format(self.name, self.digest[:8])
+
+
+class ReferenceCache:
+    """
+    Loads each reference model once per process and keeps it in memory.
+    The derived arrays are published on disk, keyed by the hash of the OBJ file, and attached to as
+    read-only memory maps: a restarted worker does not need to parse the OBJ again, and adding workers
+    does not multiply the memory used by the references.
+    The lifecycle of the published arrays is `publish` (create them and remove the stale ones, at
+    startup), `get` (attach to them, in every process) and `unlink` (remove them).
+    """
+
+    def __init__(self, obj_folder, models, cache_folder=None):
+        """
+        `obj_folder` and `models` are `Config.OBJ_FOLDER` and `Config.AVAILABLE_MODELS`,
+        `cache_folder` is where the precomputed arrays are published (nothing is published if None).
+        """
+        self.obj_folder = obj_folder
+        self.models = models
+        self.cache_folder = cache_folder
+        self.references = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+    def __getstate__(self):
+        # Sent to the processes of a pool that does not fork: they load the references from the disk cache
+        state = self.__dict__.copy()
+        del state['lock']
+        state['references'] = {}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def get(self, name):
+        """
+        Returns the `Reference` of the model `name`, loading it on first use.
+        """
+        reference = self.references.get(name)
+        if reference is not None:
+            with self.lock:
+                self.hits += 1
+            return reference
+        with self.lock:
+            reference = self.references.get(name)
+            if reference is None:
+                self.misses += 1
+                reference = self.load(name)
+                self.references[name] = reference
+            else:
+                self.hits += 1
+        return reference
+
+    def directory(self, name, digest):
+        """
+        Returns the directory where the arrays of a reference with the given OBJ hash are published.
+        """
+        return os.path.join(self.cache_folder, "{}-{}".format(name, digest))
+
+    def load(self, name):
+        """
+        Attaches to the published arrays of a reference if they are up to date, else builds them from
+        its OBJ file and publishes them.
+        """
+        path = os.path.join(self.obj_folder, self.models[name]['file'])
+        digest = file_hash(path)
+        if self.cache_folder is None:
+            return Reference.from_obj(name, path, digest)
+        directory = self.directory(name, digest)
+        if os.path.isdir(directory):
+            try:
+                reference = Reference.load(name, path, digest, directory)
+                self.disk_hits += 1
+                return reference
+            except (OSError, ValueError):
+                logger.warning("Republishing unreadable reference %s", directory)
+                shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(self.cache_folder, exist_ok=True)
+        Reference.from_obj(name, path, digest).save(directory)
+        logger.info("Reference %s published in %s", name, directory)
+        return Reference.load(name, path, digest, directory)
+
+    def warm_up(self):
+        """
+        Loads every available model.
+        """
+        for name in self.models:
+            self.get(name)
+
+    def publish(self):
+        """
+        Publishes the arrays of every available model and removes those of outdated OBJ files.
+        Meant to be called once when the application (re)starts, before the worker processes are created.
+        """
+        self.warm_up()
+        self.unlink(stale_only=True)
+
+    def unlink(self, stale_only=False):
+        """
+        Removes the published arrays, or only those that no longer match an available OBJ file.
+        Processes still attached keep their memory maps valid until they drop them.
+        """
+        if self.cache_folder is None or not os.path.isdir(self.cache_folder):
+            return []
+        current = {os.path.basename(self.directory(name, file_hash(os.path.join(self.obj_folder, model['file']))))
+                   for name, model in self.models.items()}
+        removed = []
+        for entry in os.listdir(self.cache_folder):
+            if stale_only and entry in current:
+                continue
+            path = os.path.join(self.cache_folder, entry)
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                os.remove(path)
+            removed.append(entry)
+        if not stale_only:
+            with self.lock:
+                self.references = {}
+        return removed
+
+    def stats(self):
+        """
+        Returns the hit/miss counters of the cache.
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'disk_hits': self.disk_hits,
+                'loaded': sorted(self.references)}
@@ -0,0 +1,109 @@
+"""
+Scalar rate-distortion scores of an evaluation, computed once from its curves so that submissions can be
+ranked and sorted by the database.
+The rate of a step is its size relative to the size of the reference model written in OBJA (a vertex and
+a face instruction per vertex and face): 1 is the cost of sending the uncompressed reference.
+- the area under a curve is the mean of the metric over the rates from 0 to `max_rate`, the value of a
+  step holding until the next one (and the first value before it);
+- the distortion at a rate is the value of the last step received at that rate;
+- the BD-rate (Bjontegaard delta rate) is the mean relative rate difference with a baseline for the same
+  distortion, over the distortions both reach, in percent: negative when fewer bits are needed.
+"""
+
+import numpy as np
+from csi_eval.obja import SIZES
+
+
+def reference_size(model):
+    """
+    Returns the size in bytes of a reference model of `Config.AVAILABLE_MODELS` written in OBJA.
+    """
+    return SIZES['v'] * model['vertices'] + SIZES['f'] * model['faces']
+
+
+def step_rates(steps, size, reference_bytes):
+    """
+    Returns the rate of every normalized step of a file of `size` bytes.
+    """
+    return np.asarray(steps, dtype=np.float64) * size / reference_bytes
+
+
+def area_under_curve(rates, values, max_rate=1.0):
+    """
+    Returns the mean of a step-wise constant curve over the rates from 0 to `max_rate`.
+    """
+    rates = np.asarray(rates, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    if not len(rates):
+        return None
+    # Each value holds from its rate to the next one, the first one from 0
+    starts = np.clip(np.concatenate(([0.0], rates[1:])), 0, max_rate)
+    ends = np.clip(np.concatenate((rates[1:], [max_rate])), 0, max_rate)
+    return float(np.sum(values * np.maximum(ends - starts, 0)) / max_rate)
+
+
+def value_at_rate(rates, values, rate):
+    """
+    Returns the value of the last step whose rate is at most `rate`, or None if there is none.
+    """
+    last = np.searchsorted(np.asarray(rates, dtype=np.float64), rate, side='right') - 1
+    return float(values[last]) if last >= 0 else None
+
+
+def rate_distortion(rates, distortions):
+    """
+    Returns the (distortion, log rate) points where the distortion of a curve reaches a new minimum, by
+    increasing distortion: the lowest rate giving at most each distortion.
+    """
+    rates = np.asarray(rates, dtype=np.float64)
+    distortions = np.asarray(distortions, dtype=np.float64)
+    positive = rates > 0
+    rates, distortions = rates[positive], distortions[positive]
+    if not len(rates):
+        return np.zeros(0), np.zeros(0)
+    best = np.minimum.accumulate(distortions)
+    improved = np.concatenate(([True], best[1:] < best[:-1]))
+    return best[improved][::-1], np.log(rates[improved])[::-1]
+
+
+def bd_rate(rates, distortions, baseline_rates, baseline_distortions, samples=100):
+    """
+    Returns the BD-rate of a curve against a baseline in percent, from piecewise linear interpolations of
+    their log rates, or None if their distortions do not overlap.
+    """
+    distortion, log_rate = rate_distortion(rates, distortions)
+    baseline_distortion, baseline_log_rate = rate_distortion(baseline_rates, baseline_distortions)
+    if len(distortion) < 2 or len(baseline_distortion) < 2:
+        return None
+    low = max(distortion[0], baseline_distortion[0])
+    high = min(distortion[-1], baseline_distortion[-1])
+    if not high > low:
+        return None
+    grid = np.linspace(low, high, samples)
+    difference = np.mean(np.interp(grid, distortion, log_rate) - np.interp(grid, baseline_distortion,
+                                                                           baseline_log_rate))
+    return float((np.exp(difference) - 1) * 100)
+
+
+def compute_scores(submitted_file, reference_bytes, baseline=None, low_rate=0.25, high_rate=0.5, max_rate=1.0):
+    """
+    Sets the score columns of an evaluated `models.SubmittedFile` from its curves. `baseline` is the
+    evaluated submission the BD-rates are computed against, if any.
+    """
+    steps, haus, middle_acc, middle_comp = submitted_file.curves
+    rates = step_rates(steps, submitted_file.estimated_size or submitted_file.real_size, reference_bytes)
+    submitted_file.auc_hausdorff = area_under_curve(rates, haus, max_rate)
+    submitted_file.auc_accuracy = area_under_curve(rates, np.abs(middle_acc), max_rate)
+    submitted_file.auc_completeness = area_under_curve(rates, middle_comp, max_rate)
+    submitted_file.hausdorff_low_rate = value_at_rate(rates, haus, low_rate)
+    submitted_file.hausdorff_high_rate = value_at_rate(rates, haus, high_rate)
+    submitted_file.accuracy_low_rate = value_at_rate(rates, middle_acc, low_rate)
+    submitted_file.accuracy_high_rate = value_at_rate(rates, middle_acc, high_rate)
+    submitted_file.bd_rate_hausdorff = submitted_file.bd_rate_accuracy = None
+    if baseline is not None and baseline.id == submitted_file.id:
+        submitted_file.bd_rate_hausdorff = submitted_file.bd_rate_accuracy = 0.0
+    elif baseline is not None:
+        baseline_steps, baseline_haus, baseline_acc, _ = baseline.curves
+        baseline_rates = step_rates(baseline_steps, baseline.estimated_size or baseline.real_size, reference_bytes)
+        submitted_file.bd_rate_hausdorff = bd_rate(rates, haus, baseline_rates, baseline_haus)
+        submitted_file.bd_rate_accuracy = bd_rate(rates, np.abs(middle_acc), baseline_rates, np.abs(baseline_acc))
@@ -0,0 +1,142 @@
+"""
+Instrumentation of the stages of an evaluation (parsing, snapshot building, reference loading, metrics):
+the wall time, the CPU time and the growth of the peak memory of the process spent in each of them.
+The stages are only measured within `record()`; elsewhere `stage()` returns a shared no-op context, so
+that the instrumented code costs next to nothing when the timings are disabled.
+The times of a stage exclude those of the stages nested in it, so that the stages add up to the total.
+The peak memory is the high-water mark of the resident memory of the process, which Linux resets at the
+start of each recording (`reset_peak_rss`), so that it is the peak of the evaluation rather than of the
+whole life of a worker. The memory of the processes of a pool is not included.
+"""
+
+import resource
+import time
+from contextlib import contextmanager, nullcontext
+
+# The recorder of the evaluation in progress in this process, if any
+active = None
+NO_STAGE = nullcontext()
+
+
+def reset_peak_rss():
+    """
+    Resets the peak resident memory of the process (`ru_maxrss`) to its current one, and returns whether
+    the system supports it (Linux only).
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as file:
+            file.write('5')
+    except OSError:
+        return False
+    return True
+
+
+class Stage:
+    """
+    The context measuring one call of a stage of `recorder`.
+    """
+    __slots__ = ('recorder', 'name', 'wall', 'cpu', 'rss', 'nested_wall', 'nested_cpu')
+
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self):
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        self.cpu = usage.ru_utime + usage.ru_stime
+        self.rss = usage.ru_maxrss
+        self.nested_wall = self.nested_cpu = 0.0
+        self.recorder.stack.append(self)
+        self.wall = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.wall
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        cpu = usage.ru_utime + usage.ru_stime - self.cpu
+        stack = self.recorder.stack
+        stack.pop()
+        if stack:
+            stack[-1].nested_wall += wall
+            stack[-1].nested_cpu += cpu
+        totals = self.recorder.stages.get(self.name)
+        if totals is None:
+            totals = self.recorder.stages[self.name] = [0, 0.0, 0.0, 0]
+        totals[0] += 1
+        totals[1] += wall - self.nested_wall
+        totals[2] += cpu - self.nested_cpu
+        totals[3] += usage.ru_maxrss - self.rss
+        return False
+
+
+class Recorder:
+    """
+    The per-stage totals of an evaluation: number of calls, wall and CPU seconds, and growth of the peak
+    resident memory in kilobytes.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.stack = []
+        self.peak_reset = reset_peak_rss()
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.process_time()
+        self.wall = self.cpu = None
+
+    def stop(self):
+        self.wall = time.perf_counter() - self.start_wall
+        self.cpu = time.process_time() - self.start_cpu
+
+    def summary(self):
+        """
+        Returns the timings as a dict ready for JSON. Where the peak memory could not be reset, the peak of
+        the evaluation is unknown and only the one of the whole process is given.
+        """
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return {'wall': self.wall, 'cpu': self.cpu,
+                'peak_rss_kb': peak_rss if self.peak_reset else None, 'process_peak_rss_kb': peak_rss,
+                'stages': {name: {'calls': calls, 'wall': wall, 'cpu': cpu, 'rss_growth_kb': rss}
+                           for name, (calls, wall, cpu, rss) in self.stages.items()}}
+
+
+@contextmanager
+def record():
+    """
+    Measures the stages run in this process until the end of the block, and gives their `Recorder`.
+    """
+    global active
+    previous, active = active, Recorder()
+    recorder = active
+    try:
+        yield recorder
+    finally:
+        recorder.stop()
+        active = previous
+
+
+def stage(name):
+    """
+    Returns the context measuring a call of the stage `name`, a no-op outside of `record()`.
+    """
+    if active is None:
+        return NO_STAGE
+    return Stage(active, name)
+
+
+def timed(name, iterable):
+    """
+    Iterates over `iterable`, measuring the production of each item as the stage `name`.
+    """
+    if active is None:
+        return iterable
+    return timed_items(name, iter(iterable))
+
+
+def timed_items(name, iterator):
+    while True:
+        with stage(name):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
@@ -0,0 +1,31 @@
+import os
+import shutil
+import sys
+import tempfile
+import pytest
+
+# The configuration is read when `app` is imported: give it a scratch database and leaderboard stamp, and a
+# working directory for its log folder
+TEMP_DIR = tempfile.mkdtemp(prefix='benchmarkapp-tests-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(TEMP_DIR, 'app.db')
+os.environ['LEADERBOARD_STAMP'] = os.path.join(TEMP_DIR, 'leaderboard.stamp')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(TEMP_DIR)
+
+from app import app as flask_app, db  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    """
+    The application, within its context, with empty tables.
+    """
+    with flask_app.app_context():
+        db.create_all()
+        yield flask_app
+        db.session.remove()
+        db.drop_all()
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(TEMP_DIR, ignore_errors=True)
@@ -0,0 +1,66 @@
+import pytest
+from sqlalchemy import event
+from app import db
+from app.models import User, SubmittedFile
+from app.leaderboard import leaderboard
+
+
+def add_users(count, first=0):
+    """
+    Adds `count` users, each with an evaluated best submission.
+    """
+    for index in range(first, first + count):
+        user = User(username='user{}'.format(index))
+        db.session.add(user)
+        db.session.flush()
+        submitted_file = SubmittedFile(filename='file{}.obja'.format(index), reference_file='bunny',
+                                       user_id=user.id, status='done', real_size=1, estimated_size=1)
+        submitted_file.set_curves([1, 2], [0.1, 0.2], [0.3, 0.4], [0.5, 0.6])
+        db.session.add(submitted_file)
+        db.session.flush()
+        user.best_submitted_file = submitted_file.id
+    db.session.commit()
+    leaderboard.invalidate()
+
+
+@pytest.fixture
+def statements(app):
+    """
+    The SQL statements executed during the test.
+    """
+    executed = []
+
+    def record(connection, cursor, statement, *args):
+        executed.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    yield executed
+    event.remove(db.engine, 'before_cursor_execute', record)
+
+
+def test_leaderboard_queries_do_not_grow_with_users(statements):
+    counts = []
+    for first, count in ((0, 1), (1, 24)):
+        add_users(count, first)
+        statements.clear()
+        assert len(leaderboard.best_submissions()) == first + count
+        assert len(leaderboard.users()) == first + count
+        counts.append(len(statements))
+    assert counts[0] == counts[1] == 2
+
+
+def test_index_page_queries_do_not_grow_with_users(app, statements):
+    client = app.test_client()
+    counts = []
+    for first, count in ((0, 1), (1, 24)):
+        add_users(count, first)
+        statements.clear()
+        response = client.get('/')
+        assert response.status_code == 200
+        assert response.data.count(b'user') >= first + count
+        counts.append(len(statements))
+        # Served from the cache until the next change
+        statements.clear()
+        assert client.get('/').status_code == 200
+        assert statements == []
+    assert counts[0] == counts[1]
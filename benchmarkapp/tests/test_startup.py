@@ -0,0 +1,10 @@
+from app.commands import measure_startup
+
+
+def test_import_within_budget(app, tmp_path):
+    """
+    A web process imports the application within `STARTUP_BUDGET`, without the numeric modules.
+    """
+    report = measure_startup(runs=3, cwd=tmp_path)
+    assert report['heavy'] == []
+    assert report['seconds'] <= app.config['STARTUP_BUDGET']